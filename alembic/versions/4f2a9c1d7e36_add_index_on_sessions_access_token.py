@@ -0,0 +1,24 @@
+"""add index on sessions access_token
+
+Revision ID: 4f2a9c1d7e36
+Revises: c80f294accc7
+Create Date: 2026-10-18 09:12:41.118203
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '4f2a9c1d7e36'
+down_revision = 'c80f294accc7'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_index('ix_sessions_access_token', 'sessions', ['access_token'])
+
+
+def downgrade():
+    op.drop_index('ix_sessions_access_token', table_name='sessions')
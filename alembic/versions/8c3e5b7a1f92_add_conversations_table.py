@@ -0,0 +1,80 @@
+"""add conversations table
+
+Revision ID: 8c3e5b7a1f92
+Revises: 4f2a9c1d7e36
+Create Date: 2026-10-18 11:40:22.507316
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '8c3e5b7a1f92'
+down_revision = '4f2a9c1d7e36'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('conversations',
+        sa.Column('conversation_id', sa.String(), nullable=False),
+        sa.Column('user_a_id', sa.String(), nullable=False),
+        sa.Column('user_b_id', sa.String(), nullable=False),
+        sa.Column('last_message_id', sa.String(), nullable=True),
+        sa.Column('last_message_at', sa.TIMESTAMP(), nullable=True),
+        sa.Column('user_a_unread', sa.Integer(), server_default='0', nullable=False),
+        sa.Column('user_b_unread', sa.Integer(), server_default='0', nullable=False),
+        sa.Column('created_at', sa.TIMESTAMP(), server_default=sa.text('now()'), nullable=False),
+        sa.Column('updated_at', sa.TIMESTAMP(), server_default=sa.text('now()'), nullable=False),
+        sa.ForeignKeyConstraint(['user_a_id'], ['users.user_id'], ondelete='CASCADE'),
+        sa.ForeignKeyConstraint(['user_b_id'], ['users.user_id'], ondelete='CASCADE'),
+        sa.ForeignKeyConstraint(['last_message_id'], ['messages.message_id'], ondelete='SET NULL'),
+        sa.PrimaryKeyConstraint('conversation_id'),
+        sa.UniqueConstraint('user_a_id', 'user_b_id', name='uq_conversations_pair')
+    )
+    op.create_index('ix_conversations_user_a_recent', 'conversations', ['user_a_id', 'last_message_at'])
+    op.create_index('ix_conversations_user_b_recent', 'conversations', ['user_b_id', 'last_message_at'])
+
+    # Backfill from existing messages. COLLATE "C" keeps the pair ordering
+    # identical to Python's string comparison used by the application.
+    op.execute("""
+        WITH pairs AS (
+            SELECT
+                LEAST(sender_id COLLATE "C", receiver_id COLLATE "C") AS user_a_id,
+                GREATEST(sender_id COLLATE "C", receiver_id COLLATE "C") AS user_b_id,
+                message_id,
+                receiver_id,
+                read_at,
+                created_at,
+                ROW_NUMBER() OVER (
+                    PARTITION BY
+                        LEAST(sender_id COLLATE "C", receiver_id COLLATE "C"),
+                        GREATEST(sender_id COLLATE "C", receiver_id COLLATE "C")
+                    ORDER BY created_at DESC, message_id DESC
+                ) AS rn
+            FROM messages
+        )
+        INSERT INTO conversations (
+            conversation_id, user_a_id, user_b_id, last_message_id, last_message_at,
+            user_a_unread, user_b_unread, created_at, updated_at
+        )
+        SELECT
+            gen_random_uuid()::text,
+            user_a_id,
+            user_b_id,
+            MAX(CASE WHEN rn = 1 THEN message_id END),
+            MAX(created_at),
+            COUNT(*) FILTER (WHERE receiver_id = user_a_id AND read_at IS NULL),
+            COUNT(*) FILTER (WHERE receiver_id = user_b_id AND read_at IS NULL),
+            MIN(created_at),
+            now()
+        FROM pairs
+        GROUP BY user_a_id, user_b_id
+    """)
+
+
+def downgrade():
+    op.drop_index('ix_conversations_user_b_recent', table_name='conversations')
+    op.drop_index('ix_conversations_user_a_recent', table_name='conversations')
+    op.drop_table('conversations')
@@ -0,0 +1,61 @@
+"""gym equipment and facilities as indexed jsonb
+
+Revision ID: a4d8e1f3c627
+Revises: f7c2b8e05d13
+Create Date: 2026-10-18 15:12:08.418305
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision = 'a4d8e1f3c627'
+down_revision = 'f7c2b8e05d13'
+branch_labels = None
+depends_on = None
+
+
+def _search_document(json_type):
+    return (
+        "setweight(to_tsvector('simple'::regconfig, coalesce(name, '')), 'A') || "
+        "setweight(to_tsvector('simple'::regconfig, coalesce(address, '')), 'B') || "
+        f"setweight(to_tsvector('simple'::regconfig, coalesce(facilities, '[]'::{json_type})), 'C') || "
+        f"setweight(to_tsvector('simple'::regconfig, coalesce(equipment, '[]'::{json_type})), 'C')"
+    )
+
+
+def _retype_tags(json_type):
+    # A column read by a generated column cannot change type, so the search
+    # vector is dropped and rebuilt around the change
+    op.drop_index('ix_gyms_search_vector', table_name='gyms')
+    op.drop_column('gyms', 'search_vector')
+
+    for column in ('equipment', 'facilities'):
+        op.execute(
+            f"ALTER TABLE gyms ALTER COLUMN {column} TYPE {json_type} USING {column}::text::{json_type}"
+        )
+
+    op.add_column(
+        'gyms',
+        sa.Column(
+            'search_vector',
+            postgresql.TSVECTOR(),
+            sa.Computed(_search_document(json_type), persisted=True),
+            nullable=True,
+        ),
+    )
+    op.create_index('ix_gyms_search_vector', 'gyms', ['search_vector'], postgresql_using='gin')
+
+
+def upgrade():
+    _retype_tags('jsonb')
+    op.create_index('ix_gyms_equipment', 'gyms', ['equipment'], postgresql_using='gin')
+    op.create_index('ix_gyms_facilities', 'gyms', ['facilities'], postgresql_using='gin')
+
+
+def downgrade():
+    op.drop_index('ix_gyms_facilities', table_name='gyms')
+    op.drop_index('ix_gyms_equipment', table_name='gyms')
+    _retype_tags('json')
@@ -0,0 +1,24 @@
+"""gym listing keyset index
+
+Revision ID: b9e4c7a2d815
+Revises: a4d8e1f3c627
+Create Date: 2026-10-18 15:48:31.207516
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'b9e4c7a2d815'
+down_revision = 'a4d8e1f3c627'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_index('ix_gyms_created_at', 'gyms', ['created_at', 'gym_id'])
+
+
+def downgrade():
+    op.drop_index('ix_gyms_created_at', table_name='gyms')
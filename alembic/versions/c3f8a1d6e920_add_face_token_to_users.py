@@ -0,0 +1,32 @@
+"""add face token to users
+
+Revision ID: c3f8a1d6e920
+Revises: b9e4c7a2d815
+Create Date: 2026-10-18 17:12:44.380915
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'c3f8a1d6e920'
+down_revision = 'b9e4c7a2d815'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.add_column(
+        "users",
+        sa.Column("face_token", sa.String(), nullable=True)
+    )
+    op.add_column(
+        "users",
+        sa.Column("face_faceset_shard", sa.Integer(), nullable=True)
+    )
+
+
+def downgrade():
+    op.drop_column("users", "face_faceset_shard")
+    op.drop_column("users", "face_token")
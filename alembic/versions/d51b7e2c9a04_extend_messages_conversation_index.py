@@ -0,0 +1,32 @@
+"""extend messages conversation index with created_at
+
+Revision ID: d51b7e2c9a04
+Revises: 8c3e5b7a1f92
+Create Date: 2026-10-18 11:02:17.540921
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'd51b7e2c9a04'
+down_revision = '8c3e5b7a1f92'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # (sender, receiver, created_at, message_id) serves the keyset scan of a
+    # chat in both directions and still covers the old (sender, receiver) lookups
+    op.drop_index('ix_messages_conversation', table_name='messages')
+    op.create_index(
+        'ix_messages_conversation',
+        'messages',
+        ['sender_id', 'receiver_id', 'created_at', 'message_id'],
+    )
+
+
+def downgrade():
+    op.drop_index('ix_messages_conversation', table_name='messages')
+    op.create_index('ix_messages_conversation', 'messages', ['sender_id', 'receiver_id'])
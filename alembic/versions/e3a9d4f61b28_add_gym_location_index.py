@@ -0,0 +1,38 @@
+"""add gym location index
+
+Revision ID: e3a9d4f61b28
+Revises: d51b7e2c9a04
+Create Date: 2026-10-18 13:47:05.302114
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'e3a9d4f61b28'
+down_revision = 'd51b7e2c9a04'
+branch_labels = None
+depends_on = None
+
+
+def _has_postgis(bind) -> bool:
+    return bind.execute(
+        sa.text("SELECT 1 FROM pg_extension WHERE extname = 'postgis'")
+    ).scalar() is not None
+
+
+def upgrade():
+    op.create_index('ix_gyms_location', 'gyms', ['latitude', 'longitude'])
+
+    # Only used with GEO_BACKEND=postgis
+    if _has_postgis(op.get_bind()):
+        op.execute(
+            "CREATE INDEX IF NOT EXISTS ix_gyms_location_geog ON gyms USING gist "
+            "((geography(ST_MakePoint(longitude::float8, latitude::float8))))"
+        )
+
+
+def downgrade():
+    op.execute("DROP INDEX IF EXISTS ix_gyms_location_geog")
+    op.drop_index('ix_gyms_location', table_name='gyms')
@@ -0,0 +1,43 @@
+"""add gym search vector
+
+Revision ID: f7c2b8e05d13
+Revises: e3a9d4f61b28
+Create Date: 2026-10-18 14:31:52.664870
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision = 'f7c2b8e05d13'
+down_revision = 'e3a9d4f61b28'
+branch_labels = None
+depends_on = None
+
+
+GYM_SEARCH_DOCUMENT = (
+    "setweight(to_tsvector('simple'::regconfig, coalesce(name, '')), 'A') || "
+    "setweight(to_tsvector('simple'::regconfig, coalesce(address, '')), 'B') || "
+    "setweight(to_tsvector('simple'::regconfig, coalesce(facilities, '[]'::json)), 'C') || "
+    "setweight(to_tsvector('simple'::regconfig, coalesce(equipment, '[]'::json)), 'C')"
+)
+
+
+def upgrade():
+    op.add_column(
+        'gyms',
+        sa.Column(
+            'search_vector',
+            postgresql.TSVECTOR(),
+            sa.Computed(GYM_SEARCH_DOCUMENT, persisted=True),
+            nullable=True,
+        ),
+    )
+    op.create_index('ix_gyms_search_vector', 'gyms', ['search_vector'], postgresql_using='gin')
+
+
+def downgrade():
+    op.drop_index('ix_gyms_search_vector', table_name='gyms')
+    op.drop_column('gyms', 'search_vector')
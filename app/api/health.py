@@ -1,10 +1,12 @@
 from fastapi import APIRouter
-from sqlalchemy import create_engine
+from sqlalchemy import text
 from pydantic import BaseModel
 from dotenv import load_dotenv
 import firebase_admin
 
-from app.core.database import DATABASE_URL
+from app.core.database import engine, async_engine
+from app.core.pool_metrics import pool_status
+from app.core.auth_cache import auth_cache
 from app.services.fcm_service import fcm_service
 
 load_dotenv()
@@ -13,10 +15,10 @@ router = APIRouter()
 
 
 def test_db_connection():
+    # Borrow from the shared pool instead of opening a fresh TCP+TLS connection per probe
     try:
-        engine = create_engine(DATABASE_URL)
-        conn = engine.connect()
-        conn.close()
+        with engine.connect() as conn:
+            conn.execute(text("SELECT 1"))
         return True
     except Exception as e:
         print(f"DB connection error: {e}")
@@ -59,4 +61,60 @@ def health():
         db_connected=db_status,
         fcm_enabled=fcm_service.enabled,
         fcm_initialized=fcm_initialized,
-    )
\ No newline at end of file
+    )
+
+
+class AuthCacheStatsResponse(BaseModel):
+    enabled: bool
+    size: int
+    max_entries: int
+    ttl_seconds: int
+    hits: int
+    misses: int
+    hit_ratio: float
+    evictions: int
+    invalidations: int
+
+
+@router.get(
+    "/auth-cache",
+    tags=["Health"],
+    summary="Auth Session Cache Stats",
+    description="Returns size and hit/miss counters of this worker's authenticated-session cache.",
+    response_model=AuthCacheStatsResponse,
+)
+def auth_cache_stats():
+    return AuthCacheStatsResponse(**auth_cache.stats())
+
+
+class PoolStatusResponse(BaseModel):
+    pool_class: str
+    size: int
+    checked_in: int
+    checked_out: int
+    overflow: int
+    timeout_seconds: float
+    checkouts: int = 0
+    timeouts: int = 0
+    avg_wait_ms: float = 0.0
+    max_wait_ms: float = 0.0
+    total_wait_ms: float = 0.0
+
+
+class DBPoolResponse(BaseModel):
+    sync_pool: PoolStatusResponse
+    async_pool: PoolStatusResponse
+
+
+@router.get(
+    "/db-pool",
+    tags=["Health"],
+    summary="Database Pool Stats",
+    description="Returns occupancy, overflow and checkout wait times of this worker's connection pools.",
+    response_model=DBPoolResponse,
+)
+def db_pool_stats():
+    return DBPoolResponse(
+        sync_pool=PoolStatusResponse(**pool_status(engine.pool)),
+        async_pool=PoolStatusResponse(**pool_status(async_engine.sync_engine.pool)),
+    )
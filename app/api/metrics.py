@@ -0,0 +1,97 @@
+from fastapi import APIRouter
+from fastapi.responses import PlainTextResponse
+
+from app.api.ws.connection_manager import manager
+from app.core.auth_cache import auth_cache
+from app.core.database import engine, async_engine
+from app.core.metrics import registry
+from app.core.pool_metrics import pool_status
+from app.core.gym_cache import gym_details
+from app.core.qr_registry import qr_registry
+from app.core.user_cache import user_profiles
+from app.services.checkin_verifier import checkin_verifier
+from app.services.face_id_service import facepp
+
+router = APIRouter()
+
+
+def _db_pool_samples():
+    for label, pool in (("sync", engine.pool), ("async", async_engine.sync_engine.pool)):
+        status = pool_status(pool)
+        labels = {"pool": label}
+        yield "db_pool_size", "gauge", "Configured pool size", status["size"], labels
+        yield "db_pool_checked_out", "gauge", "Connections currently checked out", status["checked_out"], labels
+        yield "db_pool_overflow", "gauge", "Connections opened beyond pool_size", status["overflow"], labels
+        yield "db_pool_checkouts_total", "counter", "Pool checkouts", status.get("checkouts", 0), labels
+        yield "db_pool_timeouts_total", "counter", "Pool checkouts that timed out", status.get("timeouts", 0), labels
+        yield "db_pool_wait_seconds_total", "counter", "Time spent waiting for a pooled connection", status.get("total_wait_ms", 0) / 1000, labels
+
+
+def _auth_cache_samples():
+    stats = auth_cache.stats()
+    yield "auth_cache_size", "gauge", "Entries in the auth session cache", stats["size"], {}
+    yield "auth_cache_hits_total", "counter", "Auth session cache hits", stats["hits"], {}
+    yield "auth_cache_misses_total", "counter", "Auth session cache misses", stats["misses"], {}
+    yield "auth_cache_evictions_total", "counter", "Auth session cache evictions", stats["evictions"], {}
+
+
+def _user_cache_samples():
+    stats = user_profiles.stats()
+    yield "user_cache_size", "gauge", "Entries in the user profile cache", stats["size"], {}
+    yield "user_cache_hits_total", "counter", "User profile cache hits", stats["hits"], {}
+    yield "user_cache_misses_total", "counter", "User profile cache misses", stats["misses"], {}
+
+
+def _gym_cache_samples():
+    stats = gym_details.stats()
+    yield "gym_cache_size", "gauge", "Entries in the gym detail cache", stats["size"], {}
+    yield "gym_cache_hits_total", "counter", "Gym detail cache hits", stats["hits"], {}
+    yield "gym_cache_misses_total", "counter", "Gym detail cache misses", stats["misses"], {}
+
+
+def _qr_registry_samples():
+    stats = qr_registry.stats()
+    yield "qr_registry_size", "gauge", "Gyms in the check-in QR nonce registry", stats["size"], {}
+    yield "qr_registry_hits_total", "counter", "QR nonce registry hits", stats["hits"], {}
+    yield "qr_registry_misses_total", "counter", "QR nonce registry misses", stats["misses"], {}
+    yield "qr_registry_stale_total", "counter", "QR nonce registry hits the database contradicted", stats["stale"], {}
+
+
+def _facepp_samples():
+    yield "facepp_requests_in_flight", "gauge", "Face++ calls currently in flight", facepp.in_flight, {}
+    yield "facepp_circuit_open", "gauge", "1 while the Face++ circuit breaker is open", int(facepp.breaker.state == "open"), {}
+
+
+def _checkin_verifier_samples():
+    yield "checkin_verify_queue_depth", "gauge", "Check-ins waiting for face verification", checkin_verifier.queue_depth, {}
+
+
+def _websocket_samples():
+    depths = manager.queue_depths()
+    yield "ws_connections", "gauge", "Open WebSocket connections on this worker", len(depths), {}
+    yield "ws_send_queue_depth", "gauge", "Messages waiting in WebSocket send queues", sum(depths), {}
+    yield "ws_send_queue_depth_max", "gauge", "Deepest WebSocket send queue", max(depths, default=0), {}
+
+
+registry.register_collector(_db_pool_samples)
+registry.register_collector(_auth_cache_samples)
+registry.register_collector(_user_cache_samples)
+registry.register_collector(_gym_cache_samples)
+registry.register_collector(_qr_registry_samples)
+registry.register_collector(_facepp_samples)
+registry.register_collector(_checkin_verifier_samples)
+registry.register_collector(_websocket_samples)
+
+
+@router.get(
+    "/metrics",
+    tags=["Health"],
+    summary="Prometheus Metrics",
+    description="Prometheus text exposition of this worker's request, outbound-call, pool and cache metrics.",
+    response_class=PlainTextResponse,
+)
+def metrics():
+    return PlainTextResponse(
+        registry.render(),
+        media_type="text/plain; version=0.0.4; charset=utf-8",
+    )
@@ -1,8 +1,9 @@
 from typing import List, Optional
-from fastapi import APIRouter, Depends, Query, UploadFile, Form, File as FastAPIFile, HTTPException, status
+from fastapi import APIRouter, Depends, Query, Request, UploadFile, Form, File as FastAPIFile, HTTPException, status
 from sqlalchemy import func
 from sqlalchemy.orm import Session
 
+from app.core.conditional import conditional_json, to_json
 from app.core.dependencies import get_db, get_current_user
 from app.crud import dietician as crud_dietician
 from app.models.dieticians import Dietician
@@ -87,6 +88,7 @@ def get_dietician_info(
 
 @router.get("/", response_model=List[DieticianListingSchema])
 def list_dieticians(
+    request: Request,
     db: Session = Depends(get_db),
     specialization: Optional[str] = Query(None),
     min_experience: Optional[int] = Query(None),
@@ -123,7 +125,8 @@ def list_dieticians(
             )
         )
 
-    return results
+    # Built from several tables, so versioned by a hash of the body
+    return conditional_json(request, to_json(List[DieticianListingSchema], results))
 
 
 @router.post("/request-verification")
@@ -1,10 +1,13 @@
-from typing import List, Optional
-from fastapi import APIRouter, Depends, HTTPException, Query, UploadFile, File
+from typing import List, Literal, Optional
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, UploadFile, File
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 from app.crud.favorites import toggle_favorite_gym
 from app.schemas.gyms import (
     GymCreate,
+    GymDetailResponse,
     GymDocumentType,
+    GymFacetsResponse,
     GymListResponse,
     GymResponse,
     GymUpdate,
@@ -17,11 +20,14 @@ from app.schemas.gyms import (
     GymReceivePaymentsOut,
     GymReceivePaymentsUpsert,
 )
+from app.core.conditional import conditional, conditional_json, weak_etag
+from app.core.database import get_async_db
 from app.core.dependencies import get_db, get_current_user, require_gym_owner
-from app.crud.gym import create_gym, get_gym, get_gym_by_id, update_gym, delete_gym, get_gyms, search_gyms, list_gym_staff, add_staff_to_gym, remove_staff_from_gym
+from app.crud.gym import create_gym, get_gym_by_id, get_gym_detail, update_gym, delete_gym, get_gyms, get_gym_facets, search_gyms, search_gyms_fulltext, list_gym_staff, add_staff_to_gym, remove_staff_from_gym
 from app.crud.gym_media import add_or_replace_gym_photo, list_gym_photos, delete_gym_photo, add_or_replace_gym_document, list_gym_documents, delete_gym_document
 from app.crud import gym_qr_code as crud
 from app.schemas.checkins import CheckinRequest, CheckinResponse
+from app.crud.checkins import get_gym_checkin_with_owner
 
 from app.models.announcements import Announcement
 from app.models.financials import Payout
@@ -43,6 +49,9 @@ from app.services.paystack_service import PaystackService
 router = APIRouter(tags=["Gyms"])
 paystack_service = PaystackService()
 
+TotalMode = Literal["false", "exact", "estimate"]
+WITH_TOTAL_HELP = "exact: COUNT(*) (default); estimate: planner estimate for large results; false: no total"
+
 
 @router.post("/", response_model=GymResponse)
 def create_gym_endpoint(
@@ -79,10 +88,22 @@ def search_gyms_endpoint(
     q: str = Query(..., min_length=1),
     skip: int = 0,
     limit: int = 10,
+    mode: Literal["contains", "fulltext"] = Query(
+        "contains",
+        description="contains: substring match (default); fulltext: ranked prefix search with snippets",
+    ),
+    with_total: TotalMode = Query("exact", description=WITH_TOTAL_HELP),
+    cursor: Optional[str] = Query(None, description="next_cursor of the previous page (skip is ignored)"),
     db: Session = Depends(get_db)
 ):
-    gyms, total = search_gyms(db, q, skip=skip, limit=limit)
-    return GymListResponse(gyms=gyms, total=total)
+    search = search_gyms_fulltext if mode == "fulltext" else search_gyms
+    gyms, total, total_estimated, next_cursor = search(db, q, skip=skip, limit=limit, with_total=with_total, cursor=cursor)
+    return GymListResponse(
+        gyms=gyms,
+        total=total,
+        total_estimated=total_estimated,
+        next_cursor=next_cursor,
+    )
 
 @router.get("/", response_model=GymListResponse)
 def list_gyms(
@@ -90,15 +111,21 @@ def list_gyms(
     limit: int = 10,
     status: str = "active",
     subscription_tier: str = None,
-    equipment: str = None,
-    facility: str = None,
+    equipment: List[str] = Query(None, description="Repeat to filter by several tags"),
+    facility: List[str] = Query(None, description="Repeat to filter by several tags"),
+    tag_match: Literal["all", "any"] = Query(
+        "all",
+        description="all: gym has every given tag (default); any: gym has at least one",
+    ),
     min_capacity: int = None,
     lat: float = None,
     lng: float = None,
     radius_km: float = None,
+    with_total: TotalMode = Query("exact", description=WITH_TOTAL_HELP),
+    cursor: Optional[str] = Query(None, description="next_cursor of the previous page (skip is ignored)"),
     db: Session = Depends(get_db)
 ):
-    gyms, total = get_gyms(
+    gyms, total, total_estimated, next_cursor = get_gyms(
         db,
         skip=skip,
         limit=limit,
@@ -106,20 +133,61 @@ def list_gyms(
         subscription_tier=subscription_tier,
         equipment=equipment,
         facility=facility,
+        tag_match=tag_match,
+        min_capacity=min_capacity,
+        lat=lat,
+        lng=lng,
+        radius_km=radius_km,
+        with_total=with_total,
+        cursor=cursor,
+    )
+    return GymListResponse(
+        gyms=gyms,
+        total=total,
+        total_estimated=total_estimated,
+        next_cursor=next_cursor,
+    )
+
+@router.get("/facets", response_model=GymFacetsResponse)
+def list_gym_facets(
+    status: str = "active",
+    subscription_tier: str = None,
+    equipment: List[str] = Query(None),
+    facility: List[str] = Query(None),
+    tag_match: Literal["all", "any"] = "all",
+    min_capacity: int = None,
+    lat: float = None,
+    lng: float = None,
+    radius_km: float = None,
+    db: Session = Depends(get_db)
+):
+    """Equipment / facility tag counts over the gyms matching the /gyms filters"""
+    facets = get_gym_facets(
+        db,
+        status=status,
+        subscription_tier=subscription_tier,
+        equipment=equipment,
+        facility=facility,
+        tag_match=tag_match,
         min_capacity=min_capacity,
         lat=lat,
         lng=lng,
         radius_km=radius_km
     )
-    return GymListResponse(gyms=gyms, total=total)
+    return GymFacetsResponse(
+        equipment=[{"value": value, "count": count} for value, count in facets["equipment"]],
+        facilities=[{"value": value, "count": count} for value, count in facets["facilities"]],
+    )
 
 
-@router.get("/{gym_id}", response_model=GymResponse)
-def get_gym_endpoint(gym_id: str, db: Session = Depends(get_db)):
-    gym = get_gym(db=db, gym_id=gym_id)
-    if not gym:
+@router.get("/{gym_id}", response_model=GymDetailResponse)
+def get_gym_endpoint(gym_id: str, request: Request, db: Session = Depends(get_db)):
+    detail = get_gym_detail(db=db, gym_id=gym_id)
+    if not detail:
         raise HTTPException(status_code=404, detail="Gym not found")
-    return gym
+
+    # Body is pre-serialized; clients revalidate with If-None-Match
+    return conditional_json(request, detail.body, etag=detail.etag)
 
 
 
@@ -159,8 +227,17 @@ def upload_or_replace_gym_photo(
 @router.get("/{gym_id}/photos", response_model=List[GymPhotoResponse])
 def get_gym_photos(
     gym_id: str,
+    request: Request,
+    response: Response,
     db: Session = Depends(get_db)
 ):
+    # The cached gym detail embeds the photos, so its ETag versions them too
+    detail = get_gym_detail(db=db, gym_id=gym_id)
+    if detail:
+        not_modified = conditional(request, response, etag=weak_etag("photos", detail.etag))
+        if not_modified:
+            return not_modified
+
     return list_gym_photos(db, gym_id)
 
 
@@ -335,13 +412,18 @@ def get_gym_qr(gym_id: str, db: Session = Depends(get_db)):
 
 
 @router.post("/{gym_id}/checkin", response_model=CheckinResponse)
-def gym_checkin(
+async def gym_checkin(
     gym_id: str,
     payload: CheckinRequest,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     user = Depends(get_current_user),
 ):
-    checkin = perform_checkin(
+    """
+    Answers with a provisional check-in straight away. The face verification
+    verdict arrives as a "checkin" WebSocket message (to the member and the
+    gym owner) and a push notification, or via GET /{gym_id}/checkins/{checkin_id}.
+    """
+    checkin = await perform_checkin(
         db,
         user=user,
         gym_id=gym_id,
@@ -361,6 +443,31 @@ def gym_checkin(
     )
 
 
+@router.get("/{gym_id}/checkins/{checkin_id}", response_model=CheckinResponse)
+async def get_gym_checkin(
+    gym_id: str,
+    checkin_id: str,
+    db: AsyncSession = Depends(get_async_db),
+    user = Depends(get_current_user),
+):
+    row = await get_gym_checkin_with_owner(db, gym_id, checkin_id)
+    if not row:
+        raise HTTPException(status_code=404, detail="Check-in not found")
+
+    checkin, owner_id = row
+    if user.user_id not in (checkin.user_id, owner_id):
+        raise HTTPException(status_code=403, detail="Not authorized to view this check-in")
+
+    return CheckinResponse(
+        checkin_id=checkin.checkin_id,
+        status=checkin.status,
+        face_score=checkin.face_score,
+        rejected_reason=checkin.rejected_reason,
+        created_at=checkin.created_at,
+        confirmed_at=checkin.confirmed_at,
+    )
+
+
 @router.post("/{gym_id}/favorite")
 def favorite_gym(
     gym_id: str,
@@ -1,8 +1,9 @@
-from fastapi import APIRouter, Depends, Query
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, Query, Response
+from typing import Optional
+from sqlalchemy.ext.asyncio import AsyncSession
 from uuid import UUID
 
-from app.core.database import get_db
+from app.core.database import get_async_db
 from app.core.dependencies import get_current_user
 from app.models.users import User
 from app.schemas.messaging import (
@@ -10,6 +11,7 @@ from app.schemas.messaging import (
     ConversationResponse,
     MessageResponse,
     MessageSend,
+    UnreadCountResponse,
 )
 from app.services.messaging_service import MessagingService 
 
@@ -19,7 +21,7 @@ router = APIRouter(tags=["Messaging"])
 @router.post("/send", response_model=MessageResponse)
 async def send_message(
     message_data: MessageSend,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_user)
 ):
     """Send a message to another user"""
@@ -33,47 +35,86 @@ async def send_message(
 
 
 @router.get("/conversations", response_model=list[ConversationPreview])
-def get_conversations(
-    db: Session = Depends(get_db),
+async def get_conversations(
+    response: Response,
+    limit: int = Query(50, ge=1, le=100),
+    cursor: Optional[str] = Query(None, description="X-Next-Cursor value from the previous page"),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_user)
 ):
-    """List all users you've messaged with"""
+    """List users you've messaged with, most recent first (next page cursor in X-Next-Cursor)"""
     
     service = MessagingService(db)
-    return service.get_conversations(
-        user_id=UUID(current_user.user_id)
+    conversations, next_cursor = await service.get_conversations(
+        user_id=UUID(current_user.user_id),
+        limit=limit,
+        cursor=cursor
+    )
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
+    return conversations
+
+
+@router.get("/unread-count", response_model=UnreadCountResponse)
+async def get_unread_count(
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_current_user)
+):
+    """Total unread messages across all your conversations"""
+    
+    service = MessagingService(db)
+    count = await service.get_unread_count(UUID(current_user.user_id))
+    return UnreadCountResponse(unread_count=count)
+
+
+@router.post("/conversations/{user_id}/read", status_code=204)
+async def mark_conversation_read(
+    user_id: UUID,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_current_user)
+):
+    """Mark every message another user sent you as read"""
+    
+    service = MessagingService(db)
+    await service.mark_conversation_read(
+        user_id=UUID(current_user.user_id),
+        other_user_id=user_id
     )
 
 
 @router.get("/conversations/{user_id}", response_model=ConversationResponse)
-def get_conversation(
+async def get_conversation(
     user_id: UUID,
     limit: int = Query(50, ge=1, le=100),
     offset: int = Query(0, ge=0),
-    db: Session = Depends(get_db),
+    before: Optional[UUID] = Query(None, description="Return messages older than this message_id (use next_before)"),
+    include_total: Optional[bool] = Query(None, description="Count all messages; defaults to true without `before`"),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_user)
 ):
     """Get messages between you and another user"""
     
     service = MessagingService(db)
-    return service.get_conversation(
+    return await service.get_conversation(
         user_id=UUID(current_user.user_id),
         other_user_id=user_id,
         limit=limit,
-        offset=offset
+        offset=offset,
+        before=before,
+        include_total=include_total
     )
 
 
 @router.delete("/{message_id}", status_code=204)
-def delete_message(
+async def delete_message(
     message_id: UUID,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_user)
 ):
     """Delete a message (only if you are the sender)"""
     
     service = MessagingService(db)
-    service.delete_message(
+    await service.delete_message(
         message_id=message_id,
         user_id=UUID(current_user.user_id)
     )
@@ -1,8 +1,9 @@
 from fastapi import APIRouter, Depends, HTTPException
 from sqlalchemy.orm import Session as DbSession
+from sqlalchemy.ext.asyncio import AsyncSession
 import logging
 
-from app.core.database import get_db
+from app.core.database import get_db, get_async_db
 from app.core.dependencies import get_current_session, get_current_user
 from app.models.users import User
 from app.models.notifications import DeviceToken, NotificationRecipient
@@ -160,15 +161,15 @@ def get_device_tokens(
 
 
 @router.get("/inbox")
-def get_notifications(
+async def get_notifications(
     limit: int = 50,
     offset: int = 0,
-    db: DbSession = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_user)
 ):
     """Get user's notification inbox"""
-    notifications = fcm_service.get_notifications(db, current_user.user_id, limit, offset)
-    unread_count = fcm_service.get_unread_count(db, current_user.user_id)
+    notifications = await fcm_service.get_notifications(db, current_user.user_id, limit, offset)
+    unread_count = await fcm_service.get_unread_count(db, current_user.user_id)
     
     return {
         "notifications": notifications,
@@ -1,9 +1,10 @@
 # app/api/v1/subscription.py
 
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Request, Response
 from sqlalchemy.orm import Session
 from typing import List
 
+from app.core.conditional import conditional, weak_etag
 from app.core.database import get_db
 from app.core.dependencies import get_current_user
 from app.schemas.subscription import (
@@ -41,9 +42,21 @@ def create_subscription_tier(
 
 @router.get("/", response_model=List[SubscriptionTierResponse])
 def list_subscription_tiers(
+    request: Request,
+    response: Response,
     active_only: bool = False,
     db: Session = Depends(get_db),
 ):
+    count, last_modified = crud.get_tiers_version(db, active_only=active_only)
+    not_modified = conditional(
+        request,
+        response,
+        etag=weak_etag("tiers", active_only, count, last_modified),
+        last_modified=last_modified,
+    )
+    if not_modified:
+        return not_modified
+
     return crud.get_all_tiers(db, active_only=active_only)
 
 
@@ -52,11 +65,22 @@ def list_subscription_tiers(
 @router.get("/{tier_id}", response_model=SubscriptionTierResponse)
 def get_subscription_tier(
     tier_id: str,
+    request: Request,
+    response: Response,
     db: Session = Depends(get_db),
 ):
     tier = crud.get_tier(db, tier_id)
     if not tier:
         raise HTTPException(status_code=404, detail="Tier not found")
+
+    not_modified = conditional(
+        request,
+        response,
+        etag=weak_etag("tier", tier.tier_id, tier.updated_at),
+        last_modified=tier.updated_at,
+    )
+    if not_modified:
+        return not_modified
     return tier
 
 
@@ -1,5 +1,5 @@
 from typing import List
-from fastapi import APIRouter, Depends, UploadFile, File, HTTPException, status
+from fastapi import APIRouter, BackgroundTasks, Depends, UploadFile, File, HTTPException, status
 from sqlalchemy.orm import Session
 from app.core.database import get_db
 from app.core.dependencies import get_current_user
@@ -16,6 +16,7 @@ from app.crud.user import (
     get_user_face_status,
 )
 from app.crud.announcements import mark_announcement_as_read
+from app.services.face_template_service import enroll_face_template
 
 
 router = APIRouter(tags=["Users"])
@@ -23,6 +24,7 @@ router = APIRouter(tags=["Users"])
 
 @router.post("/users/face", response_model=RegisterFaceResponse)
 def register_face(
+    background_tasks: BackgroundTasks,
     face: UploadFile = File(...),
     db: Session = Depends(get_db),
     user=Depends(get_current_user),
@@ -33,8 +35,18 @@ def register_face(
             detail="Face must be an image (jpeg, jpg or png)",
         )
 
+    stale_token, stale_shard = user.face_token, user.face_faceset_shard
     user = register_or_replace_user_face(db, user, face)
 
+    background_tasks.add_task(
+        enroll_face_template,
+        user.user_id,
+        user.face_file.storage_url,
+        user.face_registered_at,
+        stale_token,
+        stale_shard,
+    )
+
     return RegisterFaceResponse(
         message="Face registered successfully",
         registered_at=user.face_registered_at,
@@ -1,24 +1,34 @@
-from fastapi import WebSocket, WebSocketDisconnect, Depends, Query
-from sqlalchemy.orm import Session
+from fastapi import WebSocket, WebSocketDisconnect, Query
+from sqlalchemy import select
 from typing import Optional
+import asyncio
 import json
 import logging
 from uuid import UUID
 
-from app.core.database import get_db
+from app.core.auth_cache import auth_cache
+from app.core.database import AsyncSessionLocal
 from app.core.jwt import decode_token
 from app.models.users import User
-from app.api.ws.connection_manager import manager
+from app.api.ws.connection_manager import ClientConnection, manager
 from app.schemas.messaging import MessageSend
+from app.services.message_batcher import message_batcher
 from app.services.messaging_service import MessagingService
 from fastapi import HTTPException
 from pydantic import ValidationError
 
 logger = logging.getLogger(__name__)
 
+# Deliveries waiting on their batch commit
+_pending_deliveries: set = set()
 
-async def get_user_from_token(token: str, db: Session) -> Optional[User]:
-    """Extract user from JWT token"""
+
+async def get_user_from_token(token: str) -> Optional[User]:
+    """
+    Extract user from JWT token. Served from the auth cache when the token
+    was recently validated over HTTP; otherwise a short-lived session is
+    borrowed for the lookup and released before the socket is accepted.
+    """
     try:
         payload = decode_token(token)
         user_id = payload.get("sub")
@@ -26,7 +36,13 @@ async def get_user_from_token(token: str, db: Session) -> Optional[User]:
         if not user_id:
             return None
         
-        user = db.query(User).filter(User.user_id == user_id).first()
+        entry = auth_cache.get(token)
+        if entry is not None and entry.user_id == user_id:
+            # Detached copy; only column values are used by the socket
+            return User(**entry.user_data)
+        
+        async with AsyncSessionLocal() as db:
+            user = await db.scalar(select(User).where(User.user_id == user_id))
         return user
     except Exception as e:
         logger.error(f"WebSocket auth failed: {e}")
@@ -36,15 +52,19 @@ async def get_user_from_token(token: str, db: Session) -> Optional[User]:
 async def websocket_endpoint(
     websocket: WebSocket,
     token: str = Query(...),  # ?token=xxx in URL
-    db: Session = Depends(get_db)
 ):
     """
     WebSocket endpoint for real-time chat.
     Connect with: ws://localhost:8000/ws/chat?token=your_jwt_token
+
+    No DB connection is held while the socket is open; chat messages are
+    handed to the write-behind batcher and acknowledged with a "sent" event
+    once their batch commits. Dead sockets are detected by uvicorn's
+    protocol-level pings, which end this handler.
     """
     
     # Authenticate user
-    user = await get_user_from_token(token, db)
+    user = await get_user_from_token(token)
     if not user:
         await websocket.close(code=1008, reason="Invalid token")
         return
@@ -52,8 +72,8 @@ async def websocket_endpoint(
     user_id = user.user_id
     
     # Accept connection and register
-    await manager.connect(websocket, user_id)
-    await websocket.send_json({"type": "connected", "payload": {"user_id": str(user_id)}})
+    client = await manager.connect(websocket, user_id)
+    client.enqueue({"type": "connected", "payload": {"user_id": str(user_id)}})
     
     try:
         while True:
@@ -62,36 +82,36 @@ async def websocket_endpoint(
             try:
                 message_data = json.loads(data)
             except json.JSONDecodeError:
-                await websocket.send_json({"type": "error", "message": "Invalid JSON"})
+                client.enqueue({"type": "error", "message": "Invalid JSON"})
                 continue
             
             message_type = message_data.get("type")
             
             if message_type == "message":
                 # User sending a message
-                await handle_send_message(user, message_data, db, websocket)
+                handle_send_message(user, message_data, client)
             
             elif message_type == "ping":
                 # Keep-alive
-                await websocket.send_json({"type": "pong"})
+                client.enqueue({"type": "pong"})
             
             else:
-                await websocket.send_json({"type": "error", "message": "Unknown message type"})
+                client.enqueue({"type": "error", "message": "Unknown message type"})
                 
     except WebSocketDisconnect:
         manager.disconnect(websocket, user_id)
     except Exception as e:
-        logger.error(f"WebSocket error for user {user_id}: {e}")
+        if not client.closed:
+            logger.error(f"WebSocket error for user {user_id}: {e}")
         manager.disconnect(websocket, user_id)
 
 
-async def handle_send_message(
+def handle_send_message(
     sender: User,
     data: dict,
-    db: Session,
-    websocket: WebSocket
+    client: ClientConnection
 ):
-    """Process a new message from client"""
+    """Validate a new message from client and queue it for the next batch insert"""
     
     payload = data.get("payload", {})
     receiver_id_raw = payload.get("receiver_id")
@@ -100,7 +120,7 @@ async def handle_send_message(
     
     # Validate input
     if not receiver_id_raw or content is None:
-        await websocket.send_json({
+        client.enqueue({
             "type": "error",
             "message": "receiver_id and content required"
         })
@@ -109,7 +129,7 @@ async def handle_send_message(
     try:
         receiver_id = UUID(str(receiver_id_raw))
     except Exception:
-        await websocket.send_json({"type": "error", "message": "receiver_id must be a UUID"})
+        client.enqueue({"type": "error", "message": "receiver_id must be a UUID"})
         return
 
     file_id: Optional[UUID] = None
@@ -117,23 +137,36 @@ async def handle_send_message(
         try:
             file_id = UUID(str(file_id_raw))
         except Exception:
-            await websocket.send_json({"type": "error", "message": "file_id must be a UUID"})
+            client.enqueue({"type": "error", "message": "file_id must be a UUID"})
             return
 
     try:
         message_data = MessageSend(receiver_id=receiver_id, content=str(content), file_id=file_id)
-        service = MessagingService(db)
-        await service.send_message(
-            sender_id=UUID(sender.user_id),
-            sender_type=str(sender.role),
-            message_data=message_data,
-        )
-    except HTTPException as e:
-        await websocket.send_json({"type": "error", "message": e.detail})
     except ValidationError as e:
         first = e.errors()[0] if e.errors() else {"msg": "Invalid payload"}
-        await websocket.send_json({"type": "error", "message": first.get("msg", "Invalid payload")})
+        client.enqueue({"type": "error", "message": first.get("msg", "Invalid payload")})
+        return
+
+    try:
+        future = message_batcher.submit(UUID(sender.user_id), str(sender.role), message_data)
+    except asyncio.QueueFull:
+        client.enqueue({"type": "error", "message": "Server busy, message not sent"})
+        return
+
+    # Don't block the receive loop on the commit, so bursts share a batch
+    task = asyncio.get_running_loop().create_task(_deliver_when_stored(sender, future, client))
+    _pending_deliveries.add(task)
+    task.add_done_callback(_pending_deliveries.discard)
+
+
+async def _deliver_when_stored(sender: User, future, client: ClientConnection):
+    """Push the message and ack the sender once its batch has committed"""
+    try:
+        message = await future
+        await MessagingService.broadcast_message(message)
+    except HTTPException as e:
+        client.enqueue({"type": "error", "message": e.detail})
     except Exception as e:
         detail = getattr(e, "detail", None)
-        await websocket.send_json({"type": "error", "message": detail or "Failed to send message"})
+        client.enqueue({"type": "error", "message": detail or "Failed to send message"})
         logger.error(f"WS send_message failed for sender {sender.user_id}: {e}")
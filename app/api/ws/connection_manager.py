@@ -1,72 +1,233 @@
-from typing import Dict, Set
+from typing import Dict, Optional
 from fastapi import WebSocket
+import asyncio
 import logging
+import time
+
+from app.core.config import settings
+from app.core.metrics import (
+    ws_messages_dropped_total,
+    ws_queue_wait_seconds,
+    ws_send_duration_seconds,
+)
+from app.core.pubsub import pubsub
 
 logger = logging.getLogger(__name__)
 
+BROADCAST_CHANNEL = "ws.broadcast"
+
+
+def user_channel(user_id: str) -> str:
+    return f"ws.user.{user_id}"
+
+
+class ClientConnection:
+    """
+    One socket plus its bounded outbound queue and the writer task that
+    drains it, so a slow client only ever delays its own messages.
+
+    When the queue is full the backpressure policy either drops the oldest
+    queued message ("drop_oldest") or disconnects the client ("disconnect").
+    """
+
+    def __init__(
+        self,
+        websocket: WebSocket,
+        user_id: str,
+        on_closed,
+        max_queue: int = 256,
+        send_timeout: float = 10.0,
+        policy: str = "drop_oldest",
+    ):
+        self.websocket = websocket
+        self.user_id = user_id
+        self.send_timeout = send_timeout
+        self.policy = policy
+        self.closed = False
+
+        self._on_closed = on_closed
+        self._queue: "asyncio.Queue[tuple[float, dict]]" = asyncio.Queue(maxsize=max_queue)
+        self._writer: Optional[asyncio.Task] = None
+        self._closing: Optional[asyncio.Task] = None
+
+    @property
+    def queue_depth(self) -> int:
+        return self._queue.qsize()
+
+    def start(self) -> None:
+        self._writer = asyncio.get_running_loop().create_task(self._write_loop())
+
+    def enqueue(self, message: dict) -> bool:
+        """Queue a message without waiting on the socket. False if it was not accepted."""
+        if self.closed:
+            return False
+
+        item = (time.perf_counter(), message)
+        try:
+            self._queue.put_nowait(item)
+            return True
+        except asyncio.QueueFull:
+            pass
+
+        if self.policy == "disconnect":
+            ws_messages_dropped_total.inc(reason="slow_consumer")
+            if self._closing is None:
+                logger.warning(f"Disconnecting slow WS consumer for user {self.user_id}")
+                self._closing = asyncio.get_running_loop().create_task(self.close(code=1013, reason="Too slow"))
+            return False
+
+        self._queue.get_nowait()
+        self._queue.put_nowait(item)
+        ws_messages_dropped_total.inc(reason="queue_full")
+        return True
+
+    async def _write_loop(self) -> None:
+        # wait_for can swallow a cancel that races with completion, so the
+        # closed flag is the authoritative stop signal
+        while not self.closed:
+            queued_at, message = await self._queue.get()
+            started = time.perf_counter()
+            ws_queue_wait_seconds.observe(started - queued_at)
+            try:
+                await asyncio.wait_for(self.websocket.send_json(message), timeout=self.send_timeout)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Failed to send to user {self.user_id}: {e!r}")
+                await self.close(code=1011)
+                return
+            finally:
+                ws_send_duration_seconds.observe(time.perf_counter() - started)
+
+    async def close(self, code: int = 1000, reason: str = "") -> None:
+        if self.closed:
+            return
+        self.stop()
+        self._on_closed(self)
+        try:
+            await self.websocket.close(code=code, reason=reason)
+        except Exception:
+            # Already gone
+            pass
+
+    def stop(self) -> None:
+        """Stop the writer; queued messages are discarded."""
+        self.closed = True
+        if self._writer is not None and self._writer is not asyncio.current_task():
+            self._writer.cancel()
+
 
 class ConnectionManager:
     """
     Manages active WebSocket connections.
     Each user can have multiple connections (mobile + web).
+
+    Connections are local to this worker. Messages are delivered to local
+    sockets directly and published on the broker so workers holding the
+    user's other sockets deliver them too; a worker subscribes to a user's
+    channel while it holds at least one of their sockets.
+
+    Delivery only enqueues on each connection's bounded queue; per-connection
+    writer tasks do the actual sends concurrently.
+
+    Dead peers are detected at the protocol level: uvicorn sends WebSocket
+    pings (--ws-ping-interval / --ws-ping-timeout) and closes sockets that
+    stop answering, which ends the handler and removes the connection here.
     """
-    
-    def __init__(self):
-        # user_id -> set of websocket connections
-        self.active_connections: Dict[str, Set[WebSocket]] = {}
-    
-    async def connect(self, websocket: WebSocket, user_id: str):
+
+    def __init__(self, broker=pubsub):
+        # user_id -> websocket -> connection
+        self.active_connections: Dict[str, Dict[WebSocket, ClientConnection]] = {}
+        self.broker = broker
+        self.broker.subscribe(BROADCAST_CHANNEL, self._on_remote_broadcast)
+
+    async def connect(self, websocket: WebSocket, user_id: str) -> ClientConnection:
         """Accept connection and register it"""
         user_id = str(user_id)
         await websocket.accept()
-        
+
         if user_id not in self.active_connections:
-            self.active_connections[user_id] = set()
-        
-        self.active_connections[user_id].add(websocket)
+            self.active_connections[user_id] = {}
+            self.broker.subscribe(user_channel(user_id), self._on_remote_message)
+
+        client = ClientConnection(
+            websocket,
+            user_id,
+            on_closed=self._remove,
+            max_queue=settings.WS_SEND_QUEUE_SIZE,
+            send_timeout=settings.WS_SEND_TIMEOUT_SECONDS,
+            policy=settings.WS_BACKPRESSURE_POLICY,
+        )
+        client.start()
+        self.active_connections[user_id][websocket] = client
         logger.info(f"User {user_id} connected. Total connections: {len(self.active_connections[user_id])}")
-    
+        return client
+
     def disconnect(self, websocket: WebSocket, user_id: str):
         """Remove connection on disconnect"""
         user_id = str(user_id)
-        if user_id in self.active_connections:
-            self.active_connections[user_id].discard(websocket)
-            
-            # Clean up if no connections left
-            if not self.active_connections[user_id]:
-                del self.active_connections[user_id]
-        
+        client = self.active_connections.get(user_id, {}).get(websocket)
+        if client is not None:
+            client.stop()
+            self._remove(client)
+
         logger.info(f"User {user_id} disconnected")
-    
+
+    def _remove(self, client: ClientConnection):
+        connections = self.active_connections.get(client.user_id)
+        if connections is None:
+            return
+        connections.pop(client.websocket, None)
+
+        # Clean up if no connections left
+        if not connections:
+            del self.active_connections[client.user_id]
+            self.broker.unsubscribe(user_channel(client.user_id), self._on_remote_message)
+
+    def connection_count(self) -> int:
+        return sum(len(c) for c in self.active_connections.values())
+
+    def queue_depths(self) -> list[int]:
+        return [
+            client.queue_depth
+            for connections in self.active_connections.values()
+            for client in connections.values()
+        ]
+
     async def send_personal_message(self, message: dict, user_id: str):
-        """Send message to all connections of a specific user"""
+        """Send message to all connections of a specific user, on any worker"""
         user_id = str(user_id)
+        self.broker.publish(user_channel(user_id), {"user_id": user_id, "message": message}, local=False)
+
         if user_id not in self.active_connections:
-            logger.info(f"Dropping WS message for user {user_id}: no active connections")
+            if not self.broker.distributed:
+                logger.info(f"Dropping WS message for user {user_id}: no active connections")
             return
 
+        self._send_local(message, user_id)
+
+    def _send_local(self, message: dict, user_id: str):
         # Send to all devices (mobile + web)
-        stale_connections: list[WebSocket] = []
-        for connection in list(self.active_connections[user_id]):
-            try:
-                await connection.send_json(message)
-            except Exception as e:
-                stale_connections.append(connection)
-                logger.error(f"Failed to send to user {user_id}: {e}")
-
-        for connection in stale_connections:
-            self.active_connections.get(user_id, set()).discard(connection)
-        if user_id in self.active_connections and not self.active_connections[user_id]:
-            del self.active_connections[user_id]
-    
+        for client in list(self.active_connections.get(user_id, {}).values()):
+            client.enqueue(message)
+
     async def broadcast(self, message: dict):
-        """Send to ALL connected users (admin broadcast)"""
-        for user_id, connections in self.active_connections.items():
-            for connection in list(connections):
-                try:
-                    await connection.send_json(message)
-                except Exception as e:
-                    logger.error(f"Failed to broadcast to {user_id}: {e}")
+        """Send to ALL connected users (admin broadcast), on every worker"""
+        self.broker.publish(BROADCAST_CHANNEL, {"message": message}, local=False)
+        self._broadcast_local(message)
+
+    def _broadcast_local(self, message: dict):
+        for connections in list(self.active_connections.values()):
+            for client in list(connections.values()):
+                client.enqueue(message)
+
+    # -------- Broker callbacks (run on the event loop for messages from other workers)
+
+    def _on_remote_message(self, envelope: dict):
+        self._send_local(envelope["message"], envelope["user_id"])
+
+    def _on_remote_broadcast(self, envelope: dict):
+        self._broadcast_local(envelope["message"])
 
 # Singleton instance
 manager = ConnectionManager()
@@ -0,0 +1,211 @@
+# app/core/auth_cache.py
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Optional, Set
+
+from sqlalchemy import inspect
+from sqlalchemy.orm import Session, make_transient_to_detached
+
+from app.core.config import settings
+from app.core.pubsub import pubsub
+from app.core.revocation import REVOCATION_CHANNEL
+
+
+def hash_token(token: str) -> str:
+    return hashlib.sha256(token.encode("utf-8")).hexdigest()
+
+
+def snapshot(obj) -> dict:
+    """
+    Copy the loaded column values of an ORM instance into a plain dict.
+    Unloaded (expired/deferred) columns are skipped rather than fetched.
+    """
+    state = inspect(obj)
+    return {
+        attr.key: state.dict[attr.key]
+        for attr in state.mapper.column_attrs
+        if attr.key in state.dict
+    }
+
+
+def restore(db: Session, model, data: dict):
+    """
+    Re-attach a cached snapshot to the request's session without a SELECT.
+    Relationships still lazy-load through `db` as usual.
+    """
+    obj = model(**data)
+    make_transient_to_detached(obj)
+    return db.merge(obj, load=False)
+
+
+class AuthCacheEntry:
+    __slots__ = ("session_id", "user_id", "session_data", "user_data", "expires_at")
+
+    def __init__(self, session_data: dict, user_data: dict, expires_at: float):
+        self.session_id = session_data["session_id"]
+        self.user_id = user_data["user_id"]
+        self.session_data = session_data
+        self.user_data = user_data
+        self.expires_at = expires_at
+
+
+class AuthSessionCache:
+    """
+    Bounded TTL/LRU cache of validated (session, user) pairs keyed by the
+    SHA-256 of the access token. Process-local: every worker has its own copy,
+    so TTL bounds how long a revoked token can survive on another worker.
+    """
+
+    def __init__(self, max_entries: int = 10000, ttl_seconds: int = 30, enabled: bool = True):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.enabled = enabled
+
+        self._entries: "OrderedDict[str, AuthCacheEntry]" = OrderedDict()
+        self._by_session: Dict[str, str] = {}
+        self._by_user: Dict[str, Set[str]] = {}
+        self._lock = threading.Lock()
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    # -------------------------------------------------
+    # LOOKUP
+    # -------------------------------------------------
+    def get(self, token: str) -> Optional[AuthCacheEntry]:
+        """Look up a token, counting the hit or miss."""
+        if not self.enabled:
+            return None
+
+        entry = self._lookup(hash_token(token))
+        with self._lock:
+            if entry is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+        return entry
+
+    def peek(self, token: str) -> Optional[AuthCacheEntry]:
+        """Look up a token without touching the hit/miss counters."""
+        if not self.enabled:
+            return None
+        return self._lookup(hash_token(token))
+
+    def _lookup(self, key: str) -> Optional[AuthCacheEntry]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+
+            if entry.expires_at <= time.time():
+                self._remove(key)
+                self.evictions += 1
+                return None
+
+            self._entries.move_to_end(key)
+            return entry
+
+    # -------------------------------------------------
+    # STORE
+    # -------------------------------------------------
+    def set(self, token: str, session, user, token_exp: Optional[float] = None) -> None:
+        if not self.enabled or self.max_entries <= 0:
+            return
+
+        expires_at = time.time() + self.ttl_seconds
+        if token_exp is not None:
+            expires_at = min(expires_at, float(token_exp))
+
+        entry = AuthCacheEntry(snapshot(session), snapshot(user), expires_at)
+        key = hash_token(token)
+
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+
+            self._entries[key] = entry
+            self._by_session[entry.session_id] = key
+            self._by_user.setdefault(entry.user_id, set()).add(key)
+
+            while len(self._entries) > self.max_entries:
+                oldest = next(iter(self._entries))
+                self._remove(oldest)
+                self.evictions += 1
+
+    # -------------------------------------------------
+    # INVALIDATION
+    # -------------------------------------------------
+    def invalidate_token(self, token: str) -> None:
+        with self._lock:
+            if self._remove(hash_token(token)):
+                self.invalidations += 1
+
+    def invalidate_session(self, session_id: str) -> None:
+        with self._lock:
+            key = self._by_session.get(str(session_id))
+            if key and self._remove(key):
+                self.invalidations += 1
+
+    def invalidate_user(self, user_id: str) -> None:
+        with self._lock:
+            for key in list(self._by_user.get(str(user_id), ())):
+                if self._remove(key):
+                    self.invalidations += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._by_session.clear()
+            self._by_user.clear()
+
+    def _remove(self, key: str) -> bool:
+        # Caller must hold the lock
+        entry = self._entries.pop(key, None)
+        if entry is None:
+            return False
+
+        if self._by_session.get(entry.session_id) == key:
+            del self._by_session[entry.session_id]
+
+        keys = self._by_user.get(entry.user_id)
+        if keys is not None:
+            keys.discard(key)
+            if not keys:
+                del self._by_user[entry.user_id]
+        return True
+
+    # -------------------------------------------------
+    # STATS
+    # -------------------------------------------------
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "enabled": self.enabled,
+                "size": len(self._entries),
+                "max_entries": self.max_entries,
+                "ttl_seconds": self.ttl_seconds,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+                "evictions": self.evictions,
+                "invalidations": self.invalidations,
+            }
+
+
+# Singleton instance
+auth_cache = AuthSessionCache(
+    max_entries=settings.AUTH_CACHE_MAX_ENTRIES,
+    ttl_seconds=settings.AUTH_CACHE_TTL_SECONDS,
+    enabled=settings.AUTH_CACHE_ENABLED,
+)
+
+# Revocations published by other workers drop our cached copy too
+pubsub.subscribe(
+    REVOCATION_CHANNEL,
+    lambda message: auth_cache.invalidate_session(message["session_id"]),
+)
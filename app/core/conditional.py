@@ -0,0 +1,123 @@
+# app/core/conditional.py
+import hashlib
+from datetime import datetime, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+from functools import lru_cache
+from typing import Any, Optional
+
+from fastapi import Request, Response
+from pydantic import TypeAdapter
+
+# Clients may keep a copy but must revalidate it before every use
+CACHE_CONTROL = "no-cache"
+
+
+# -------------------------------------------------
+# VALIDATORS
+# -------------------------------------------------
+def _version_text(value: Any) -> str:
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return "" if value is None else str(value)
+
+
+def weak_etag(*versions: Any) -> str:
+    """
+    Weak ETag from version values that change whenever the representation
+    does (ids, row counts, max(updated_at) ...), so it can be computed
+    without loading or serializing the resource.
+    """
+    digest = hashlib.sha1("|".join(_version_text(v) for v in versions).encode("utf-8")).hexdigest()
+    return f'W/"{digest[:20]}"'
+
+
+def body_etag(body: bytes) -> str:
+    """Strong ETag for an exact serialized body."""
+    return '"' + hashlib.sha1(body).hexdigest()[:20] + '"'
+
+
+def _utc(value: datetime) -> datetime:
+    # TIMESTAMP columns are naive and written by the database in UTC
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return value.astimezone(timezone.utc).replace(microsecond=0)
+
+
+def is_not_modified(request: Request, etag: Optional[str] = None, last_modified: Optional[datetime] = None) -> bool:
+    """
+    Whether the client's cached copy is current. If-None-Match (weak
+    comparison) wins over If-Modified-Since, as in RFC 9110.
+    """
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        if etag is None:
+            return False
+        if if_none_match.strip() == "*":
+            return True
+        wanted = etag.removeprefix("W/")
+        return any(tag.strip().removeprefix("W/") == wanted for tag in if_none_match.split(","))
+
+    if_modified_since = request.headers.get("if-modified-since")
+    if if_modified_since and last_modified is not None:
+        try:
+            since = parsedate_to_datetime(if_modified_since)
+        except (TypeError, ValueError):
+            return False
+        return _utc(last_modified) <= _utc(since)
+
+    return False
+
+
+def validator_headers(etag: Optional[str] = None, last_modified: Optional[datetime] = None) -> dict:
+    headers = {"Cache-Control": CACHE_CONTROL}
+    if etag is not None:
+        headers["ETag"] = etag
+    if last_modified is not None:
+        headers["Last-Modified"] = format_datetime(_utc(last_modified), usegmt=True)
+    return headers
+
+
+# -------------------------------------------------
+# RESPONSES
+# -------------------------------------------------
+def conditional(
+    request: Request,
+    response: Response,
+    etag: Optional[str] = None,
+    last_modified: Optional[datetime] = None,
+) -> Optional[Response]:
+    """
+    For endpoints that return data normally: puts the validators on
+    `response` and returns a 304 to send instead when the client's copy is
+    current (None otherwise), before anything is loaded or serialized.
+    """
+    headers = validator_headers(etag, last_modified)
+    if is_not_modified(request, etag, last_modified):
+        return Response(status_code=304, headers=headers)
+    response.headers.update(headers)
+    return None
+
+
+def conditional_json(
+    request: Request,
+    body: bytes,
+    etag: Optional[str] = None,
+    last_modified: Optional[datetime] = None,
+) -> Response:
+    """Serve an already-serialized JSON body, or a 304; ETag defaults to a hash of the body."""
+    etag = etag or body_etag(body)
+    headers = validator_headers(etag, last_modified)
+    if is_not_modified(request, etag, last_modified):
+        return Response(status_code=304, headers=headers)
+    return Response(content=body, media_type="application/json", headers=headers)
+
+
+@lru_cache(maxsize=None)
+def _adapter(schema) -> TypeAdapter:
+    return TypeAdapter(schema)
+
+
+def to_json(schema, data: Any) -> bytes:
+    """Serialize ORM objects / dicts through a response schema (e.g. List[GymPhotoResponse])."""
+    adapter = _adapter(schema)
+    return adapter.dump_json(adapter.validate_python(data, from_attributes=True))
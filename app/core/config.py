@@ -8,6 +8,22 @@ from typing import Any, Dict, Literal
 class Settings(BaseSettings):
     DATABASE_URL: str
 
+    # Connection pool (per engine, per worker)
+    DB_POOL_SIZE: int = 5
+    DB_MAX_OVERFLOW: int = 10
+    DB_POOL_TIMEOUT: int = 30
+    DB_POOL_RECYCLE: int = 1800
+    # 0 disables the server-side statement timeout
+    DB_STATEMENT_TIMEOUT_MS: int = 0
+    # Defaults to on in dev, off in prod
+    DB_ECHO: Optional[bool] = None
+
+    # Per-request query counting / N+1 detection (adds X-DB-Queries, X-DB-Time)
+    DB_QUERY_TRACKING: bool = False
+    DB_QUERY_LOG_THRESHOLD: int = 20
+    DB_QUERY_TIME_LOG_THRESHOLD_MS: int = 500
+    DB_N_PLUS_ONE_THRESHOLD: int = 5
+
     SECRET_KEY: str
     JWT_SECRET: str
 
@@ -23,6 +39,23 @@ class Settings(BaseSettings):
     FACE_API_SECRET: str 
     FACE_API_KEY: str 
 
+    # Face++ client: pooled connections, bounded concurrency, retries with
+    # jitter, and a circuit breaker that opens after consecutive failures
+    FACEPP_TIMEOUT_SECONDS: float = 10.0
+    FACEPP_MAX_CONNECTIONS: int = 50
+    FACEPP_MAX_CONCURRENCY: int = 20
+    FACEPP_RETRIES: int = 2
+    FACEPP_BREAKER_THRESHOLD: int = 5
+    FACEPP_BREAKER_RESET_SECONDS: float = 30.0
+    # Prefix of the FaceSets ("<prefix>-0", "<prefix>-1", ... 10k faces each)
+    # that keep registered users' face_tokens from expiring (72h)
+    FACEPP_FACESET_OUTER_ID: str = "gym-software-users"
+
+    # Check-ins answer with a provisional check-in; face verification runs on
+    # this many background workers, with at most this many check-ins queued
+    CHECKIN_VERIFY_WORKERS: int = 8
+    CHECKIN_VERIFY_QUEUE_SIZE: int = 500
+
     PAYSTACK_SECRET_KEY: str
     PAYSTACK_PUBLIC_KEY: str
 
@@ -34,6 +67,76 @@ class Settings(BaseSettings):
 
     FIREBASE_CREDENTIALS: Optional[str] = None
 
+    # "session": every request is checked against the sessions table
+    # "jwt": trust signature + exp, only consult the in-memory revocation list
+    AUTH_MODE: Literal["session", "jwt"] = "session"
+
+    # Proximity search: "bbox" (lat/lng index + haversine) or "postgis"
+    # (needs the postgis extension and its geography index)
+    GEO_BACKEND: Literal["bbox", "postgis"] = "bbox"
+
+    # with_total=estimate: planner row estimates below this are replaced by
+    # an exact COUNT (cheap there, and where estimates are least reliable)
+    COUNT_ESTIMATE_EXACT_BELOW: int = 1000
+
+    # gzip/brotli for responses of at least COMPRESSION_MIN_SIZE bytes
+    # (brotli only when the brotli package is installed)
+    COMPRESSION_ENABLED: bool = True
+    COMPRESSION_MIN_SIZE: int = 1024
+    COMPRESSION_GZIP_LEVEL: int = 6
+    COMPRESSION_BROTLI_QUALITY: int = 4
+
+    # Request / outbound-call metrics served at /metrics
+    METRICS_ENABLED: bool = True
+
+    # In-process cache of validated (session, user) pairs per access token
+    AUTH_CACHE_ENABLED: bool = True
+    AUTH_CACHE_MAX_ENTRIES: int = 10000
+    AUTH_CACHE_TTL_SECONDS: int = 30
+
+    # In-process cache of user role/status/name used by messaging
+    USER_CACHE_ENABLED: bool = True
+    USER_CACHE_MAX_ENTRIES: int = 50000
+    USER_CACHE_TTL_SECONDS: int = 300
+
+    # In-process cache of serialized GET /gyms/{gym_id} bodies
+    GYM_CACHE_ENABLED: bool = True
+    GYM_CACHE_MAX_ENTRIES: int = 5000
+    GYM_CACHE_TTL_SECONDS: int = 600
+
+    # In-process registry of each gym's active QR nonce for check-ins;
+    # rotations drop entries on every worker, TTL bounds missed signals.
+    # Hits skip the database only with PUBSUB_BACKEND=postgres: with "memory"
+    # a rotation on another worker would be missed for up to the TTL, so every
+    # nonce is still checked against the database
+    QR_REGISTRY_ENABLED: bool = True
+    QR_REGISTRY_MAX_ENTRIES: int = 20000
+    QR_REGISTRY_TTL_SECONDS: int = 300
+
+    # Cross-worker pub/sub (WebSocket fan-out, revocations)
+    # "memory": single process only; "postgres": LISTEN/NOTIFY on DATABASE_URL
+    PUBSUB_BACKEND: Literal["memory", "postgres"] = "memory"
+    PUBSUB_PG_CHANNEL: str = "app_events"
+
+    # Per-connection WebSocket send queue; when full either drop the oldest
+    # queued message or disconnect the slow client
+    WS_SEND_QUEUE_SIZE: int = 256
+    WS_SEND_TIMEOUT_SECONDS: float = 10.0
+    WS_BACKPRESSURE_POLICY: Literal["drop_oldest", "disconnect"] = "drop_oldest"
+
+    # Chat messages sent over WebSocket are coalesced into one INSERT per
+    # window (or per WS_BATCH_MAX_SIZE messages); beyond WS_BATCH_QUEUE_SIZE
+    # waiting messages, sends are refused
+    WS_BATCH_WINDOW_MS: int = 5
+    WS_BATCH_MAX_SIZE: int = 100
+    WS_BATCH_QUEUE_SIZE: int = 5000
+
+    @property
+    def db_echo(self) -> bool:
+        if self.DB_ECHO is not None:
+            return self.DB_ECHO
+        return self.ENVIRONMENT == "dev"
+
     @property
     def firebase_credentials_dict(self) -> Optional[Dict[str, Any]]:
         """Parse the raw JSON string into a dictionary"""
@@ -1,8 +1,11 @@
 from fastapi import Depends, HTTPException, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from sqlalchemy.orm import Session
+from app.core.config import settings
 from app.core.database import get_db
 from app.core.jwt import decode_token
+from app.core.auth_cache import auth_cache, restore
+from app.core.revocation import revocation_list
 from app.models.auth import Session as DBSession
 from app.models.users import User
 from app.models.gyms import Gym
@@ -11,12 +14,49 @@ from app.models.gyms import Gym
 
 security = HTTPBearer()
 
+
+def _session_from_jwt(db: Session, token: str):
+    """
+    Stateless path: trust the signature and `exp`, consult only the in-memory
+    revocation list. Returns None for legacy tokens without a `sid` claim so
+    they fall back to the sessions table.
+    """
+    try:
+        payload = decode_token(token)
+    except Exception:
+        raise HTTPException(status_code=401, detail="Invalid token")
+
+    session_id = payload.get("sid")
+    user_id = payload.get("sub")
+    if not session_id or not user_id:
+        return None
+
+    if revocation_list.is_revoked(session_id, payload.get("iat")):
+        raise HTTPException(status_code=401, detail="Session expired")
+
+    return restore(db, DBSession, {
+        "session_id": session_id,
+        "user_id": user_id,
+        "access_token": token,
+        "is_active": True,
+    })
+
+
 def get_current_session(
     credentials: HTTPAuthorizationCredentials = Depends(security),
     db: Session = Depends(get_db),
 ):
     token = credentials.credentials
 
+    cached = auth_cache.get(token)
+    if cached:
+        return restore(db, DBSession, cached.session_data)
+
+    if settings.AUTH_MODE == "jwt":
+        session = _session_from_jwt(db, token)
+        if session is not None:
+            return session
+
     session = (
         db.query(DBSession)
         .filter(
@@ -36,6 +76,11 @@ def get_current_user(
     session: DBSession = Depends(get_current_session),
 ):
     token = session.access_token
+
+    cached = auth_cache.peek(token)
+    if cached:
+        return restore(db, User, cached.user_data)
+
     try:
         payload = decode_token(token)
         user_id = payload.get("sub")
@@ -50,6 +95,8 @@ def get_current_user(
     if not user or user.status != "active":
         raise HTTPException(status_code=403, detail="Access denied")
 
+    auth_cache.set(token, session, user, token_exp=payload.get("exp"))
+
     return user
 
 
@@ -0,0 +1,188 @@
+# app/core/gym_cache.py
+import threading
+import time
+from collections import OrderedDict
+from typing import Optional
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session, object_session
+
+from app.core.conditional import body_etag
+from app.core.config import settings
+from app.core.pubsub import pubsub
+from app.models.files import File
+from app.models.gyms import Gym, GymDocument, GymPhoto
+from app.models.ratings import Rating
+
+GYM_CHANGED_CHANNEL = "gyms.changed"
+
+
+class GymDetail:
+    """A serialized gym detail body plus the validators sent with it."""
+
+    __slots__ = ("gym_id", "body", "etag", "last_modified", "expires_at")
+
+    def __init__(self, gym_id: str, body: bytes, last_modified, expires_at: float):
+        self.gym_id = gym_id
+        self.body = body
+        self.etag = body_etag(body)
+        self.last_modified = last_modified
+        self.expires_at = expires_at
+
+
+class GymDetailCache:
+    """
+    Bounded TTL/LRU cache of serialized GET /gyms/{gym_id} bodies. Entries
+    are dropped when the gym, its photos/documents (or their files) or its
+    ratings are flushed, on this worker and, through the pub/sub broker, on
+    the others; TTL bounds anything that slips past (bulk UPDATEs).
+    """
+
+    def __init__(self, max_entries: int = 5000, ttl_seconds: int = 600, enabled: bool = True, broker=pubsub):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.enabled = enabled
+        self.broker = broker
+
+        self._entries: "OrderedDict[str, GymDetail]" = OrderedDict()
+        self._lock = threading.Lock()
+        # Bumped on every drop; a detail built before a drop is not stored
+        self._generation = 0
+
+        self.hits = 0
+        self.misses = 0
+
+        self.broker.subscribe(GYM_CHANGED_CHANNEL, lambda message: self._drop(message["gym_id"]))
+
+    # -------------------------------------------------
+    # LOOKUP
+    # -------------------------------------------------
+    def get(self, gym_id: str) -> Optional[GymDetail]:
+        if not self.enabled:
+            return None
+
+        gym_id = str(gym_id)
+        with self._lock:
+            detail = self._entries.get(gym_id)
+            if detail is not None and detail.expires_at <= time.time():
+                del self._entries[gym_id]
+                detail = None
+
+            if detail is None:
+                self.misses += 1
+                return None
+
+            self._entries.move_to_end(gym_id)
+            self.hits += 1
+            return detail
+
+    def generation(self) -> int:
+        """Token to pass to set() for a detail about to be built."""
+        with self._lock:
+            return self._generation
+
+    # -------------------------------------------------
+    # STORE / INVALIDATE
+    # -------------------------------------------------
+    def set(self, gym_id: str, body: bytes, last_modified, generation: int) -> GymDetail:
+        detail = GymDetail(str(gym_id), body, last_modified, time.time() + self.ttl_seconds)
+        if not self.enabled or self.max_entries <= 0:
+            return detail
+
+        with self._lock:
+            # Something was invalidated while this was being built
+            if generation != self._generation:
+                return detail
+            self._entries[detail.gym_id] = detail
+            self._entries.move_to_end(detail.gym_id)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return detail
+
+    def invalidate(self, gym_id: str) -> None:
+        """Drop a gym's detail here and on every other worker."""
+        self._drop(gym_id)
+        self.broker.publish(GYM_CHANGED_CHANNEL, {"gym_id": str(gym_id)}, local=False)
+
+    def _drop(self, gym_id: str) -> None:
+        with self._lock:
+            self._generation += 1
+            self._entries.pop(str(gym_id), None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._generation += 1
+            self._entries.clear()
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "enabled": self.enabled,
+                "size": len(self._entries),
+                "max_entries": self.max_entries,
+                "ttl_seconds": self.ttl_seconds,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+            }
+
+
+# Singleton instance
+gym_details = GymDetailCache(
+    max_entries=settings.GYM_CACHE_MAX_ENTRIES,
+    ttl_seconds=settings.GYM_CACHE_TTL_SECONDS,
+    enabled=settings.GYM_CACHE_ENABLED,
+)
+
+
+def _mark_changed(target, gym_id) -> None:
+    if not gym_id:
+        return
+    gym_details._drop(gym_id)
+    # Drop again (and tell other workers) at commit, as in user_cache
+    session = object_session(target)
+    if session is not None:
+        session.info.setdefault("changed_gym_ids", set()).add(gym_id)
+
+
+@event.listens_for(Gym, "after_update")
+@event.listens_for(Gym, "after_delete")
+def _invalidate_gym(mapper, connection, target):
+    _mark_changed(target, target.gym_id)
+
+
+@event.listens_for(GymPhoto, "after_insert")
+@event.listens_for(GymPhoto, "after_update")
+@event.listens_for(GymPhoto, "after_delete")
+@event.listens_for(GymDocument, "after_insert")
+@event.listens_for(GymDocument, "after_update")
+@event.listens_for(GymDocument, "after_delete")
+def _invalidate_gym_media(mapper, connection, target):
+    _mark_changed(target, target.gym_id)
+
+
+@event.listens_for(File, "after_update")
+def _invalidate_gym_file(mapper, connection, target):
+    # Photos replaced in place only touch their File row
+    if target.owner_type == "gym":
+        _mark_changed(target, target.owner_id)
+
+
+@event.listens_for(Rating, "after_insert")
+@event.listens_for(Rating, "after_update")
+@event.listens_for(Rating, "after_delete")
+def _invalidate_gym_rating(mapper, connection, target):
+    if target.target_type == "gym":
+        _mark_changed(target, target.target_id)
+
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_after_commit(session):
+    for gym_id in session.info.pop("changed_gym_ids", ()):
+        gym_details.invalidate(gym_id)
+
+
+@event.listens_for(Session, "after_rollback")
+def _forget_after_rollback(session):
+    session.info.pop("changed_gym_ids", None)
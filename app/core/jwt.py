@@ -1,16 +1,21 @@
+import time
 from datetime import datetime, timedelta
 from jose import jwt
 from app.core.config import settings
 
 ALGORITHM = "HS256"
 
-def create_access_token(subject: str):
+def create_access_token(subject: str, session_id: str | None = None):
     payload = {
         "sub": subject,
+        # sub-second precision so a refresh can revoke older tokens of the same session
+        "iat": time.time(),
         "exp": datetime.utcnow() + timedelta(
             minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES
         )
     }
+    if session_id:
+        payload["sid"] = session_id
     return jwt.encode(payload, settings.JWT_SECRET, algorithm=ALGORITHM)
 
 def decode_token(token: str):
@@ -0,0 +1,103 @@
+# app/core/pagination.py
+import base64
+import json
+from datetime import datetime
+from typing import Callable, Optional, Sequence, Tuple
+
+from fastapi import HTTPException
+from sqlalchemy import and_, or_
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.orm import Session
+from sqlalchemy.sql.expression import ClauseElement, Executable
+
+from app.core.config import settings
+
+
+def encode_cursor(created_at: datetime, item_id: str) -> str:
+    """Opaque keyset cursor for (created_at, id) ordered listings."""
+    raw = json.dumps([created_at.isoformat(), str(item_id)], separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str) -> tuple[datetime, str]:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        created_at, item_id = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+        return datetime.fromisoformat(created_at), str(item_id)
+    except Exception:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+
+def encode_keyset(kind: str, values: Sequence) -> str:
+    """
+    Opaque cursor for an arbitrary keyset (strings, numbers, datetimes).
+    `kind` names the ordering, so a cursor from one listing mode is rejected
+    by another.
+    """
+    raw = json.dumps(
+        [kind, [v.isoformat() if isinstance(v, datetime) else v for v in values]],
+        separators=(",", ":"),
+    )
+    return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def decode_keyset(cursor: str, kind: str, types: Sequence[Callable]) -> list:
+    """Decode an encode_keyset cursor, coercing each value with `types`."""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        cursor_kind, values = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+        if cursor_kind != kind or len(values) != len(types):
+            raise ValueError(cursor_kind)
+        return [coerce(value) for coerce, value in zip(types, values)]
+    except Exception:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+
+def keyset_after(keys: Sequence[tuple], values: Sequence):
+    """
+    WHERE clause for the rows after `values` in the order given by `keys`,
+    a list of (column, descending) pairs; directions may be mixed.
+    """
+    clauses = []
+    for i, (column, descending) in enumerate(keys):
+        ties = [key[0] == value for key, value in zip(keys[:i], values[:i])]
+        clauses.append(and_(*ties, column < values[i] if descending else column > values[i]))
+    return or_(*clauses)
+
+
+# -------------------------------------------------
+# TOTALS
+# -------------------------------------------------
+class _Explain(Executable, ClauseElement):
+    inherit_cache = False
+
+    def __init__(self, statement):
+        self.statement = statement
+
+
+@compiles(_Explain, "postgresql")
+def _compile_explain(element, compiler, **kw):
+    return "EXPLAIN (FORMAT JSON) " + compiler.process(element.statement, **kw)
+
+
+def estimate_count(db: Session, query) -> int:
+    """Row count from the planner's estimate for `query`, without running it."""
+    plan = db.execute(_Explain(query.statement)).scalar()
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    return int(plan[0]["Plan"]["Plan Rows"])
+
+
+def count_total(db: Session, query, mode: str) -> Tuple[Optional[int], bool]:
+    """
+    (total, estimated) for a listing according to with_total: "exact" runs
+    COUNT(*), "false" skips it (None), "estimate" uses the planner's
+    estimate and only counts exactly when that estimate is small.
+    """
+    if mode == "false":
+        return None, False
+    if mode == "estimate" and db.get_bind().dialect.name == "postgresql":
+        estimate = estimate_count(db, query)
+        if estimate >= settings.COUNT_ESTIMATE_EXACT_BELOW:
+            return estimate, True
+    return query.order_by(None).count(), False
@@ -0,0 +1,86 @@
+# app/core/pool_metrics.py
+import threading
+import time
+
+from sqlalchemy import exc
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
+
+
+class PoolWaitStats:
+    """Checkout wait-time counters for a connection pool."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.checkouts = 0
+        self.timeouts = 0
+        self.total_wait_seconds = 0.0
+        self.max_wait_seconds = 0.0
+
+    def record(self, waited: float, timed_out: bool = False) -> None:
+        with self._lock:
+            if timed_out:
+                self.timeouts += 1
+            else:
+                self.checkouts += 1
+            self.total_wait_seconds += waited
+            self.max_wait_seconds = max(self.max_wait_seconds, waited)
+
+    def as_dict(self) -> dict:
+        with self._lock:
+            avg = self.total_wait_seconds / self.checkouts if self.checkouts else 0.0
+            return {
+                "checkouts": self.checkouts,
+                "timeouts": self.timeouts,
+                "avg_wait_ms": round(avg * 1000, 3),
+                "max_wait_ms": round(self.max_wait_seconds * 1000, 3),
+                "total_wait_ms": round(self.total_wait_seconds * 1000, 3),
+            }
+
+
+class _WaitTimingMixin:
+    """
+    Times every checkout from the pool (queue wait plus, when the pool grows,
+    the time to open the new connection).
+    """
+
+    @property
+    def wait_stats(self) -> PoolWaitStats:
+        # Lazily created so pools rebuilt by recreate() start with fresh stats
+        stats = self.__dict__.get("_wait_stats")
+        if stats is None:
+            stats = self.__dict__["_wait_stats"] = PoolWaitStats()
+        return stats
+
+    def _do_get(self):
+        started = time.perf_counter()
+        try:
+            conn = super()._do_get()
+        except exc.TimeoutError:
+            self.wait_stats.record(time.perf_counter() - started, timed_out=True)
+            raise
+        self.wait_stats.record(time.perf_counter() - started)
+        return conn
+
+
+class InstrumentedQueuePool(_WaitTimingMixin, QueuePool):
+    pass
+
+
+class InstrumentedAsyncQueuePool(_WaitTimingMixin, AsyncAdaptedQueuePool):
+    pass
+
+
+def pool_status(pool) -> dict:
+    """Snapshot of a QueuePool's occupancy plus checkout wait stats."""
+    status = {
+        "pool_class": type(pool).__name__,
+        "size": pool.size(),
+        "checked_in": pool.checkedin(),
+        "checked_out": pool.checkedout(),
+        "overflow": pool.overflow(),
+        "timeout_seconds": pool.timeout(),
+    }
+    stats = getattr(pool, "wait_stats", None)
+    if stats is not None:
+        status.update(stats.as_dict())
+    return status
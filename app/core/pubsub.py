@@ -0,0 +1,253 @@
+# app/core/pubsub.py
+import asyncio
+import json
+import logging
+import os
+import socket
+import threading
+from typing import Callable, Dict, List, Optional
+from uuid import uuid4
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+class InMemoryPubSub:
+    """
+    Process-local publish/subscribe. Stand-in for a shared broker: with a
+    single worker it behaves exactly like one; with several workers each
+    process only sees its own publishes.
+    """
+
+    # Whether publishes reach other processes
+    distributed = False
+
+    def __init__(self):
+        self._subscribers: Dict[str, List[Callable[[dict], None]]] = {}
+        self._lock = threading.Lock()
+
+    async def start(self) -> None:
+        pass
+
+    async def stop(self) -> None:
+        pass
+
+    def subscribe(self, channel: str, callback: Callable[[dict], None]) -> None:
+        with self._lock:
+            self._subscribers.setdefault(channel, []).append(callback)
+
+    def unsubscribe(self, channel: str, callback: Callable[[dict], None]) -> None:
+        with self._lock:
+            callbacks = self._subscribers.get(channel, [])
+            if callback in callbacks:
+                callbacks.remove(callback)
+            if not callbacks:
+                self._subscribers.pop(channel, None)
+
+    def publish(self, channel: str, message: dict, local: bool = True) -> None:
+        """
+        Deliver `message` to subscribers of `channel`. With local=False only
+        other processes are notified (callers that already handled it here).
+        """
+        if local:
+            self._dispatch(channel, message)
+
+    def _dispatch(self, channel: str, message: dict) -> None:
+        with self._lock:
+            callbacks = list(self._subscribers.get(channel, []))
+
+        for callback in callbacks:
+            try:
+                callback(message)
+            except Exception as e:
+                logger.error(f"Pub/sub subscriber failed on {channel}: {e}")
+
+
+class PostgresPubSub(InMemoryPubSub):
+    """
+    Pub/sub across workers over Postgres LISTEN/NOTIFY, so no extra broker
+    is needed. Every worker LISTENs on one Postgres channel; each envelope
+    carries the application channel and is only dispatched if this worker
+    has subscribers for it (e.g. the users whose sockets it holds).
+
+    Publishes are delivered locally right away and NOTIFYed for the other
+    workers; a worker ignores the echo of its own NOTIFYs. NOTIFY payloads
+    are capped by Postgres at ~8000 bytes, so a larger envelope is split
+    into chunks NOTIFYed in one transaction (delivered together, in order)
+    and reassembled by the listeners.
+    """
+
+    distributed = True
+    MAX_PAYLOAD_BYTES = 7900
+    # Room for the "<origin> <chunk id> <seq> <count>" header of a chunk
+    CHUNK_BYTES = MAX_PAYLOAD_BYTES - 200
+
+    def __init__(self, dsn: str, pg_channel: str = "app_events"):
+        super().__init__()
+        self.dsn = dsn
+        self.pg_channel = pg_channel
+        self.origin = f"{socket.gethostname()}:{os.getpid()}:{uuid4().hex[:8]}"
+
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._listener: Optional[asyncio.Task] = None
+        # "<origin> <chunk id>" -> chunks received so far of a split envelope
+        self._partial: Dict[str, List[Optional[str]]] = {}
+
+    async def start(self) -> None:
+        if self._listener is not None:
+            return
+        self._loop = asyncio.get_running_loop()
+        self._listener = self._loop.create_task(self._listen())
+
+    async def stop(self) -> None:
+        if self._listener is None:
+            return
+        self._listener.cancel()
+        try:
+            await self._listener
+        except asyncio.CancelledError:
+            pass
+        self._listener = None
+
+    def publish(self, channel: str, message: dict, local: bool = True) -> None:
+        if local:
+            self._dispatch(channel, message)
+
+        payload = json.dumps(
+            {"origin": self.origin, "channel": channel, "message": message},
+            default=str,
+            # \uXXXX escapes would triple the size of non-ASCII text
+            ensure_ascii=False,
+        )
+        payloads = self._split(payload)
+
+        loop = self._loop
+        if loop is None or not loop.is_running():
+            logger.warning(f"Pub/sub not started; {channel} message not sent to other workers")
+            return
+
+        try:
+            running = asyncio.get_running_loop()
+        except RuntimeError:
+            running = None
+
+        if running is loop:
+            loop.create_task(self._notify(payloads))
+        else:
+            # Called from a threadpool (sync endpoint)
+            asyncio.run_coroutine_threadsafe(self._notify(payloads), loop)
+
+    def _split(self, payload: str) -> List[str]:
+        """The NOTIFY payloads for an envelope: itself, or its chunks if too large."""
+        data = payload.encode("utf-8")
+        if len(data) <= self.MAX_PAYLOAD_BYTES:
+            return [payload]
+
+        pieces = []
+        start = 0
+        while start < len(data):
+            end = min(start + self.CHUNK_BYTES, len(data))
+            # Don't cut a multi-byte character in two
+            while end < len(data) and data[end] & 0xC0 == 0x80:
+                end -= 1
+            pieces.append(data[start:end].decode("utf-8"))
+            start = end
+
+        chunk_id = uuid4().hex[:12]
+        return [
+            f"{self.origin} {chunk_id} {seq} {len(pieces)}\n{piece}"
+            for seq, piece in enumerate(pieces)
+        ]
+
+    async def _notify(self, payloads: List[str]) -> None:
+        from sqlalchemy import func, select
+
+        from app.core.database import async_engine
+
+        try:
+            # One transaction: chunks of an envelope arrive together and in order
+            async with async_engine.begin() as conn:
+                for payload in payloads:
+                    await conn.execute(select(func.pg_notify(self.pg_channel, payload)))
+        except Exception as e:
+            logger.error(f"Pub/sub NOTIFY failed: {e}")
+
+    async def _listen(self) -> None:
+        import psycopg
+        from psycopg import sql
+
+        delay = 1.0
+        while True:
+            try:
+                async with await psycopg.AsyncConnection.connect(self.dsn, autocommit=True) as conn:
+                    await conn.execute(sql.SQL("LISTEN {}").format(sql.Identifier(self.pg_channel)))
+                    logger.info(f"Pub/sub listening on {self.pg_channel} as {self.origin}")
+                    delay = 1.0
+                    # Chunks cut off by a lost connection will never complete
+                    self._partial.clear()
+                    async for notify in conn.notifies():
+                        self._handle(notify.payload)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Pub/sub listener lost connection: {e}; retrying in {delay:.0f}s")
+                await asyncio.sleep(delay)
+                delay = min(delay * 2, 30.0)
+
+    def _handle(self, payload: str) -> None:
+        if not payload.startswith("{"):
+            payload = self._reassemble(payload)
+            if payload is None:
+                return
+
+        try:
+            envelope = json.loads(payload)
+        except ValueError:
+            logger.error("Pub/sub received a malformed payload")
+            return
+
+        if envelope.get("origin") == self.origin:
+            return
+        self._dispatch(envelope["channel"], envelope["message"])
+
+    def _reassemble(self, payload: str) -> Optional[str]:
+        """Collect one chunk; returns the whole envelope once its last chunk is in."""
+        header, _, piece = payload.partition("\n")
+        try:
+            origin, chunk_id, seq, count = header.split(" ")
+            seq, count = int(seq), int(count)
+        except ValueError:
+            logger.error("Pub/sub received a malformed chunk")
+            return None
+
+        if origin == self.origin:
+            return None
+
+        key = f"{origin} {chunk_id}"
+        pieces = self._partial.setdefault(key, [None] * count)
+        pieces[seq] = piece
+        if any(p is None for p in pieces):
+            return None
+
+        del self._partial[key]
+        return "".join(pieces)
+
+
+def _listen_dsn() -> str:
+    from sqlalchemy.engine import make_url
+
+    from app.core.database import DATABASE_URL
+
+    # libpq does not understand SQLAlchemy driver suffixes (+psycopg2 ...)
+    return make_url(DATABASE_URL).set(drivername="postgresql").render_as_string(hide_password=False)
+
+
+def create_pubsub() -> InMemoryPubSub:
+    if settings.PUBSUB_BACKEND == "postgres":
+        return PostgresPubSub(_listen_dsn(), pg_channel=settings.PUBSUB_PG_CHANNEL)
+    return InMemoryPubSub()
+
+
+# Singleton instance
+pubsub = create_pubsub()
@@ -0,0 +1,190 @@
+# app/core/qr_registry.py
+import threading
+import time
+from collections import OrderedDict
+from typing import Optional
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session, object_session
+
+from app.core.config import settings
+from app.core.pubsub import pubsub
+from app.models.gyms import Gym, GymQRCode
+
+GYM_QR_CHANGED_CHANNEL = "gym_qr.changed"
+
+
+class GymQR:
+    """What a check-in needs to know about a gym: its owner and active QR nonce."""
+
+    __slots__ = ("gym_id", "owner_id", "qr_nonce", "expires_at")
+
+    def __init__(self, gym_id: str, owner_id: Optional[str], qr_nonce: Optional[str], expires_at: float):
+        self.gym_id = gym_id
+        self.owner_id = owner_id
+        # None while the gym has no active QR code
+        self.qr_nonce = qr_nonce
+        self.expires_at = expires_at
+
+
+class QRNonceRegistry:
+    """
+    Bounded in-process LRU map of gym_id -> active QR nonce (and owner), so
+    check-in QR validation is a dict lookup instead of a gym_qr_codes + gyms
+    query.
+
+    Entries are dropped when a gym's QR code is rotated/deactivated or the
+    gym changes, on this worker and, through the pub/sub broker, on the
+    others; TTL bounds anything that slips past. Callers fall back to the
+    database on a miss or an unknown nonce and report entries that turned
+    out to be stale.
+
+    A hit only stands in for the database when the broker reaches other
+    workers (`trusted`); with the in-memory broker another worker's rotation
+    would go unnoticed here until the TTL, so callers check every nonce.
+    """
+
+    def __init__(self, max_entries: int = 20000, ttl_seconds: int = 300, enabled: bool = True, broker=pubsub):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.enabled = enabled
+        self.broker = broker
+
+        self._entries: "OrderedDict[str, GymQR]" = OrderedDict()
+        self._lock = threading.Lock()
+        # Bumped on every drop; an entry loaded before a drop is not stored
+        self._generation = 0
+
+        self.hits = 0
+        self.misses = 0
+        self.stale = 0
+
+        self.broker.subscribe(GYM_QR_CHANGED_CHANNEL, lambda message: self._drop(message["gym_id"]))
+
+    # -------------------------------------------------
+    # LOOKUP
+    # -------------------------------------------------
+    def get(self, gym_id: str) -> Optional[GymQR]:
+        if not self.enabled:
+            return None
+
+        gym_id = str(gym_id)
+        with self._lock:
+            entry = self._entries.get(gym_id)
+            if entry is not None and entry.expires_at <= time.time():
+                del self._entries[gym_id]
+                entry = None
+
+            if entry is None:
+                self.misses += 1
+                return None
+
+            self._entries.move_to_end(gym_id)
+            self.hits += 1
+            return entry
+
+    @property
+    def trusted(self) -> bool:
+        """Whether a hit can be accepted without asking the database."""
+        return self.enabled and self.broker.distributed
+
+    def generation(self) -> int:
+        """Token to pass to set() for an entry about to be loaded."""
+        with self._lock:
+            return self._generation
+
+    def record_stale(self) -> None:
+        """A hit that the database contradicted (a rotation we hadn't heard of)."""
+        with self._lock:
+            self.stale += 1
+
+    # -------------------------------------------------
+    # STORE / INVALIDATE
+    # -------------------------------------------------
+    def set(self, gym_id: str, owner_id: Optional[str], qr_nonce: Optional[str], generation: int) -> GymQR:
+        entry = GymQR(str(gym_id), owner_id, qr_nonce, time.time() + self.ttl_seconds)
+        if not self.enabled or self.max_entries <= 0:
+            return entry
+
+        with self._lock:
+            # Something was invalidated while this was being loaded
+            if generation != self._generation:
+                return entry
+            self._entries[entry.gym_id] = entry
+            self._entries.move_to_end(entry.gym_id)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return entry
+
+    def invalidate(self, gym_id: str) -> None:
+        """Drop a gym's entry here and on every other worker."""
+        self._drop(gym_id)
+        self.broker.publish(GYM_QR_CHANGED_CHANNEL, {"gym_id": str(gym_id)}, local=False)
+
+    def _drop(self, gym_id: str) -> None:
+        with self._lock:
+            self._generation += 1
+            self._entries.pop(str(gym_id), None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._generation += 1
+            self._entries.clear()
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "enabled": self.enabled,
+                "trusted": self.trusted,
+                "size": len(self._entries),
+                "max_entries": self.max_entries,
+                "ttl_seconds": self.ttl_seconds,
+                "hits": self.hits,
+                "misses": self.misses,
+                "stale": self.stale,
+                "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+                "stale_ratio": round(self.stale / self.hits, 4) if self.hits else 0.0,
+            }
+
+
+# Singleton instance
+qr_registry = QRNonceRegistry(
+    max_entries=settings.QR_REGISTRY_MAX_ENTRIES,
+    ttl_seconds=settings.QR_REGISTRY_TTL_SECONDS,
+    enabled=settings.QR_REGISTRY_ENABLED,
+)
+
+
+def _mark_changed(target, gym_id) -> None:
+    if not gym_id:
+        return
+    qr_registry._drop(gym_id)
+    # Drop again (and tell other workers) at commit, as in gym_cache
+    session = object_session(target)
+    if session is not None:
+        session.info.setdefault("changed_qr_gym_ids", set()).add(gym_id)
+
+
+@event.listens_for(GymQRCode, "after_insert")
+@event.listens_for(GymQRCode, "after_update")
+@event.listens_for(GymQRCode, "after_delete")
+def _invalidate_gym_qr(mapper, connection, target):
+    _mark_changed(target, target.gym_id)
+
+
+@event.listens_for(Gym, "after_update")
+@event.listens_for(Gym, "after_delete")
+def _invalidate_gym(mapper, connection, target):
+    _mark_changed(target, target.gym_id)
+
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_after_commit(session):
+    for gym_id in session.info.pop("changed_qr_gym_ids", ()):
+        qr_registry.invalidate(gym_id)
+
+
+@event.listens_for(Session, "after_rollback")
+def _forget_after_rollback(session):
+    session.info.pop("changed_qr_gym_ids", None)
@@ -0,0 +1,123 @@
+# app/core/query_tracking.py
+import logging
+import threading
+import time
+from contextvars import ContextVar
+from typing import Dict, Optional
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+_current_stats: ContextVar[Optional["RequestQueryStats"]] = ContextVar(
+    "request_query_stats", default=None
+)
+_installed = False
+
+
+class RequestQueryStats:
+    """Queries issued while serving a single request."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.count = 0
+        self.total_seconds = 0.0
+        self.statements: Dict[str, int] = {}
+
+    def record(self, statement: str, elapsed: float) -> None:
+        with self._lock:
+            self.count += 1
+            self.total_seconds += elapsed
+            self.statements[statement] = self.statements.get(statement, 0) + 1
+
+    def repeated(self, threshold: int) -> Dict[str, int]:
+        """Identical statements executed at least `threshold` times (likely N+1s)."""
+        with self._lock:
+            return {s: n for s, n in self.statements.items() if n >= threshold}
+
+    @property
+    def total_ms(self) -> float:
+        return self.total_seconds * 1000
+
+
+def current_query_stats() -> Optional[RequestQueryStats]:
+    return _current_stats.get()
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if _current_stats.get() is None:
+        return
+    conn.info.setdefault("query_start_time", []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    stats = _current_stats.get()
+    if stats is None:
+        return
+    starts = conn.info.get("query_start_time")
+    if not starts:
+        return
+    stats.record(statement, time.perf_counter() - starts.pop())
+
+
+def enable_query_tracking() -> None:
+    """Hook cursor events on every engine (sync and async). Idempotent."""
+    global _installed
+    if _installed:
+        return
+    event.listen(Engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(Engine, "after_cursor_execute", _after_cursor_execute)
+    _installed = True
+
+
+class QueryTrackingMiddleware:
+    """
+    Counts SQL statements and DB time per HTTP request.
+
+    Adds X-DB-Queries / X-DB-Time (ms) response headers, logs requests above
+    the configured thresholds and warns about statements repeated often
+    enough to look like N+1 loops. Opt-in via DB_QUERY_TRACKING.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        stats = RequestQueryStats()
+        token = _current_stats.set(stats)
+
+        async def send_with_headers(message):
+            if message["type"] == "http.response.start":
+                headers = list(message.get("headers", []))
+                headers.append((b"x-db-queries", str(stats.count).encode()))
+                headers.append((b"x-db-time", f"{stats.total_ms:.2f}".encode()))
+                message["headers"] = headers
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_headers)
+        finally:
+            _current_stats.reset(token)
+            self._report(scope, stats)
+
+    def _report(self, scope, stats: RequestQueryStats) -> None:
+        path = f'{scope.get("method", "")} {scope.get("path", "")}'
+
+        if (
+            stats.count >= settings.DB_QUERY_LOG_THRESHOLD
+            or stats.total_ms >= settings.DB_QUERY_TIME_LOG_THRESHOLD_MS
+        ):
+            logger.warning(
+                f"{path} ran {stats.count} queries in {stats.total_ms:.1f}ms"
+            )
+
+        for statement, count in stats.repeated(settings.DB_N_PLUS_ONE_THRESHOLD).items():
+            preview = " ".join(statement.split())[:200]
+            logger.warning(f"Possible N+1 on {path}: {count}x {preview}")
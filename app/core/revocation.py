@@ -0,0 +1,115 @@
+# app/core/revocation.py
+import threading
+import time
+from datetime import datetime
+from typing import Dict, Optional, Tuple
+
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.core.pubsub import pubsub
+
+REVOCATION_CHANNEL = "auth.revocations"
+
+
+class RevocationList:
+    """
+    Compact in-memory set of revoked session ids used by the stateless JWT
+    auth mode. Each entry only lives as long as an access token can, after
+    which the token's own `exp` rejects it anyway.
+
+    session_id -> (issued_before, expires_at)
+      issued_before: tokens of this session with iat < issued_before are revoked
+                     (inf for a logged-out session)
+    """
+
+    def __init__(self, token_lifetime_seconds: int, broker=pubsub):
+        self.token_lifetime_seconds = token_lifetime_seconds
+        self.broker = broker
+
+        self._revoked: Dict[str, Tuple[float, float]] = {}
+        self._lock = threading.Lock()
+
+        self.broker.subscribe(REVOCATION_CHANNEL, self._apply)
+
+    def revoke_session(self, session_id: str) -> None:
+        """Revoke every token issued for a session (logout)."""
+        self._publish(session_id, None)
+
+    def revoke_tokens_before(self, session_id: str, issued_before: float) -> None:
+        """Revoke tokens of a session issued before a point in time (refresh)."""
+        self._publish(session_id, issued_before)
+
+    def is_revoked(self, session_id: str, issued_at: Optional[float]) -> bool:
+        with self._lock:
+            entry = self._revoked.get(str(session_id))
+            if entry is None:
+                return False
+
+            issued_before, expires_at = entry
+            if expires_at <= time.time():
+                del self._revoked[str(session_id)]
+                return False
+
+        if issued_at is None:
+            return True
+        return float(issued_at) < issued_before
+
+    def load_from_db(self, db: Session) -> int:
+        """
+        Seed the list with sessions that were logged out but whose refresh
+        window is still open, so a freshly started worker honours logouts
+        that happened before it booted.
+        """
+        from app.models.auth import Session as DBSession
+
+        rows = (
+            db.query(DBSession.session_id)
+            .filter(
+                DBSession.is_active == False,
+                DBSession.expires_at > datetime.utcnow(),
+            )
+            .all()
+        )
+        expires_at = time.time() + self.token_lifetime_seconds
+        with self._lock:
+            for (session_id,) in rows:
+                self._revoked[session_id] = (float("inf"), expires_at)
+        return len(rows)
+
+    def _publish(self, session_id: str, issued_before: Optional[float]) -> None:
+        message = {"session_id": str(session_id), "issued_before": issued_before}
+        # Apply locally first so the revoking request is consistent even if
+        # the broker delivers asynchronously
+        self._apply(message)
+        self.broker.publish(REVOCATION_CHANNEL, message)
+
+    def _apply(self, message: dict) -> None:
+        session_id = message["session_id"]
+        issued_before = message.get("issued_before")
+        issued_before = float("inf") if issued_before is None else float(issued_before)
+        expires_at = time.time() + self.token_lifetime_seconds
+
+        with self._lock:
+            current = self._revoked.get(session_id)
+            if current is not None:
+                issued_before = max(issued_before, current[0])
+            self._revoked[session_id] = (issued_before, expires_at)
+
+            self._prune()
+
+    def _prune(self) -> None:
+        # Caller must hold the lock
+        now = time.time()
+        for session_id in [k for k, (_, exp) in self._revoked.items() if exp <= now]:
+            del self._revoked[session_id]
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._revoked)
+
+
+# Singleton instance
+revocation_list = RevocationList(
+    token_lifetime_seconds=settings.ACCESS_TOKEN_EXPIRE_MINUTES * 60,
+)
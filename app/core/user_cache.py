@@ -0,0 +1,180 @@
+# app/core/user_cache.py
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Iterable, Optional
+
+from sqlalchemy import event, inspect, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session, object_session
+
+from app.core.config import settings
+from app.core.pubsub import pubsub
+from app.models.users import User
+
+USER_CHANGED_CHANNEL = "users.changed"
+
+# Columns whose change makes a cached profile stale
+PROFILE_FIELDS = ("role", "status", "full_name")
+
+
+class UserProfile:
+    __slots__ = ("user_id", "role", "status", "full_name", "expires_at")
+
+    def __init__(self, user_id: str, role: str, status: str, full_name: str, expires_at: float):
+        self.user_id = user_id
+        self.role = role
+        self.status = status
+        self.full_name = full_name
+        self.expires_at = expires_at
+
+
+class UserProfileCache:
+    """
+    Bounded TTL/LRU cache of the few user columns read on almost every chat
+    operation (role, status, display name). Entries are dropped when a User
+    row with a changed profile field is flushed, on this worker and, through
+    the pub/sub broker, on the others; TTL bounds anything that slips past.
+    """
+
+    def __init__(self, max_entries: int = 50000, ttl_seconds: int = 300, enabled: bool = True, broker=pubsub):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.enabled = enabled
+        self.broker = broker
+
+        self._entries: "OrderedDict[str, UserProfile]" = OrderedDict()
+        self._lock = threading.Lock()
+
+        self.hits = 0
+        self.misses = 0
+
+        self.broker.subscribe(USER_CHANGED_CHANNEL, lambda message: self._drop(message["user_id"]))
+
+    # -------------------------------------------------
+    # LOOKUP
+    # -------------------------------------------------
+    def get(self, user_id: str) -> Optional[UserProfile]:
+        if not self.enabled:
+            return None
+
+        user_id = str(user_id)
+        with self._lock:
+            profile = self._entries.get(user_id)
+            if profile is not None and profile.expires_at <= time.time():
+                del self._entries[user_id]
+                profile = None
+
+            if profile is None:
+                self.misses += 1
+                return None
+
+            self._entries.move_to_end(user_id)
+            self.hits += 1
+            return profile
+
+    async def get_many(self, db: AsyncSession, user_ids: Iterable[str]) -> Dict[str, UserProfile]:
+        """Profiles for the given ids; misses are loaded with a single query."""
+        wanted = {str(u) for u in user_ids}
+        found: Dict[str, UserProfile] = {}
+        missing = []
+        for user_id in wanted:
+            profile = self.get(user_id)
+            if profile is None:
+                missing.append(user_id)
+            else:
+                found[user_id] = profile
+
+        if missing:
+            rows = await db.execute(
+                select(User.user_id, User.role, User.status, User.full_name)
+                .where(User.user_id.in_(missing))
+            )
+            for row in rows.all():
+                found[row.user_id] = self.set(row.user_id, row.role, row.status, row.full_name)
+
+        return found
+
+    async def get_one(self, db: AsyncSession, user_id: str) -> Optional[UserProfile]:
+        return (await self.get_many(db, [user_id])).get(str(user_id))
+
+    # -------------------------------------------------
+    # STORE / INVALIDATE
+    # -------------------------------------------------
+    def set(self, user_id: str, role: str, status: str, full_name: str) -> UserProfile:
+        profile = UserProfile(str(user_id), str(role), str(status), full_name, time.time() + self.ttl_seconds)
+        if not self.enabled or self.max_entries <= 0:
+            return profile
+
+        with self._lock:
+            self._entries[profile.user_id] = profile
+            self._entries.move_to_end(profile.user_id)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return profile
+
+    def invalidate(self, user_id: str) -> None:
+        """Drop a user's profile here and on every other worker."""
+        self._drop(user_id)
+        self.broker.publish(USER_CHANGED_CHANNEL, {"user_id": str(user_id)}, local=False)
+
+    def _drop(self, user_id: str) -> None:
+        with self._lock:
+            self._entries.pop(str(user_id), None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "enabled": self.enabled,
+                "size": len(self._entries),
+                "max_entries": self.max_entries,
+                "ttl_seconds": self.ttl_seconds,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+            }
+
+
+# Singleton instance
+user_profiles = UserProfileCache(
+    max_entries=settings.USER_CACHE_MAX_ENTRIES,
+    ttl_seconds=settings.USER_CACHE_TTL_SECONDS,
+    enabled=settings.USER_CACHE_ENABLED,
+)
+
+
+def _mark_changed(target) -> None:
+    user_profiles._drop(target.user_id)
+    # Drop again (and tell other workers) at commit: a concurrent reader may have re-cached the old
+    # committed row between our flush and commit
+    session = object_session(target)
+    if session is not None:
+        session.info.setdefault("changed_user_ids", set()).add(target.user_id)
+
+
+@event.listens_for(User, "after_update")
+def _invalidate_on_update(mapper, connection, target):
+    state = inspect(target)
+    if any(state.attrs[field].history.has_changes() for field in PROFILE_FIELDS):
+        _mark_changed(target)
+
+
+@event.listens_for(User, "after_delete")
+def _invalidate_on_delete(mapper, connection, target):
+    _mark_changed(target)
+
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_after_commit(session):
+    for user_id in session.info.pop("changed_user_ids", ()):
+        user_profiles.invalidate(user_id)
+
+
+@event.listens_for(Session, "after_rollback")
+def _forget_after_rollback(session):
+    session.info.pop("changed_user_ids", None)
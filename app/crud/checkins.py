@@ -1,16 +1,17 @@
+from sqlalchemy import select, update
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 from datetime import datetime, timedelta
-from uuid import uuid4
 
 from app.models.checkins import Checkin
-from app.models.gyms import Gym, GymQRCode
+from app.models.gyms import Gym
 
 
 PROVISIONAL_EXPIRY_MINUTES = 5
 
 
-def create_provisional_checkin(
-    db: Session,
+async def create_provisional_checkin(
+    db: AsyncSession,
     *,
     user_id,
     gym_id,
@@ -18,40 +19,27 @@ def create_provisional_checkin(
     client_lat=None,
     client_lng=None
 ):
-    # 1. Validate QR
-    qr = (
-        db.query(GymQRCode)
-        .filter(
-            GymQRCode.qr_nonce == qr_nonce,
-            GymQRCode.gym_id == gym_id,
-            GymQRCode.is_active == True
-        )
-        .first()
-    )
+    # The QR nonce is validated by the caller (see resolve_checkin_qr)
 
-    if not qr:
-        raise ValueError("Invalid or expired QR code")
-
-    # 2. Prevent duplicate provisional check-ins
+    # 1. Prevent duplicate provisional check-ins
     expiry_cutoff = datetime.utcnow() - timedelta(minutes=PROVISIONAL_EXPIRY_MINUTES)
 
-    existing = (
-        db.query(Checkin)
-        .filter(
+    existing = await db.scalar(
+        select(Checkin.checkin_id)
+        .where(
             Checkin.user_id == user_id,
             Checkin.gym_id == gym_id,
             Checkin.status == "provisional",
             Checkin.created_at >= expiry_cutoff
         )
-        .first()
+        .limit(1)
     )
 
     if existing:
         raise ValueError("Active provisional check-in already exists")
 
-    # 3. Create check-in
+    # 2. Create check-in
     checkin = Checkin(
-        checkin_id=uuid4(),
         user_id=user_id,
         gym_id=gym_id,
         qr_nonce=qr_nonce,
@@ -61,12 +49,54 @@ def create_provisional_checkin(
     )
 
     db.add(checkin)
-    db.commit()
-    db.refresh(checkin)
+    await db.commit()
+    await db.refresh(checkin)
 
     return checkin
 
 
+async def resolve_provisional_checkin(
+    db: AsyncSession,
+    checkin_id: str,
+    *,
+    status: str,
+    face_score=None,
+    rejected_reason=None,
+):
+    """
+    Record the face verification verdict. Only provisional check-ins are
+    touched, so a late verdict can't resurrect an expired one.
+    Returns the updated check-in, or None if it was no longer provisional.
+    """
+    checkin = (
+        await db.execute(
+            update(Checkin)
+            .where(Checkin.checkin_id == checkin_id, Checkin.status == "provisional")
+            .values(
+                status=status,
+                face_score=face_score,
+                rejected_reason=rejected_reason,
+                confirmed_at=datetime.utcnow() if status == "confirmed" else None,
+            )
+            .returning(Checkin)
+        )
+    ).scalar_one_or_none()
+    await db.commit()
+    return checkin
+
+
+async def expire_stale_provisional_checkins(db: AsyncSession) -> int:
+    """Provisional check-ins whose verification never finished (e.g. a restart)."""
+    expiry_cutoff = datetime.utcnow() - timedelta(minutes=PROVISIONAL_EXPIRY_MINUTES)
+    result = await db.execute(
+        update(Checkin)
+        .where(Checkin.status == "provisional", Checkin.created_at < expiry_cutoff)
+        .values(status="expired", rejected_reason="Verification did not complete")
+    )
+    await db.commit()
+    return result.rowcount
+
+
 def get_user_checkins(
     db: Session,
     target_user_id: str,
@@ -93,3 +123,14 @@ def get_gym_checkins(db: Session, gym_id: str):
         .order_by(Checkin.created_at.desc())
         .all()
     )
+
+
+async def get_gym_checkin_with_owner(db: AsyncSession, gym_id: str, checkin_id: str):
+    """(Checkin, gym owner_id) or None"""
+    return (
+        await db.execute(
+            select(Checkin, Gym.owner_id)
+            .join(Gym, Gym.gym_id == Checkin.gym_id)
+            .where(Checkin.checkin_id == checkin_id, Checkin.gym_id == gym_id)
+        )
+    ).first()
@@ -1,7 +1,14 @@
-from sqlalchemy.orm import Session
-from sqlalchemy import String, or_, and_, func, cast
-from app.models.gyms import Gym
-from app.schemas.gyms import GymCreate
+import math
+import re
+from datetime import datetime
+from sqlalchemy.orm import Session, joinedload
+from sqlalchemy import Float, String, or_, and_, func, cast, literal, select, text, true, union_all
+from sqlalchemy.dialects.postgresql import array
+from app.core.config import settings
+from app.core.gym_cache import GymDetail, gym_details
+from app.core.pagination import count_total, decode_keyset, encode_keyset, keyset_after
+from app.models.gyms import Gym, GymPhoto
+from app.schemas.gyms import GymCreate, GymDetailResponse, GymPhotoResponse
 from typing import Optional, List, Tuple
 from app.models.users import User
 from app.models.relationships import GymStaff
@@ -19,6 +26,32 @@ def get_gym(db: Session, gym_id: str) -> Gym | None:
     return db.query(Gym).filter(Gym.gym_id == gym_id).first()
 
 
+def get_gym_detail(db: Session, gym_id: str) -> GymDetail | None:
+    """
+    Serialized GymDetailResponse for a gym, from the detail cache or built
+    from one eager-loaded query (gym + photos + their files) and cached.
+    """
+    detail = gym_details.get(gym_id)
+    if detail is not None:
+        return detail
+
+    generation = gym_details.generation()
+    gym = (
+        db.query(Gym)
+        .options(joinedload(Gym.gym_photos).joinedload(GymPhoto.file))
+        .filter(Gym.gym_id == gym_id)
+        .first()
+    )
+    if not gym:
+        return None
+
+    photos = sorted(gym.gym_photos, key=lambda p: (not p.is_primary, p.display_order or 0, p.created_at))
+    response = GymDetailResponse.model_validate(gym).model_copy(
+        update={"photos": [GymPhotoResponse.model_validate(p, from_attributes=True) for p in photos]}
+    )
+    return gym_details.set(gym.gym_id, response.model_dump_json().encode("utf-8"), gym.updated_at, generation)
+
+
 def update_gym(db: Session, gym_id: str, updates: dict) -> Gym | None:
     gym = db.query(Gym).filter(Gym.gym_id == gym_id).first()
     if not gym:
@@ -39,21 +72,113 @@ def delete_gym(db: Session, gym_id: str) -> Gym | None:
     return gym
 
 
-def get_gyms(
-    db: Session,
-    skip: int = 0,
-    limit: int = 10,
+EARTH_RADIUS_KM = 6371.0
+KM_PER_DEGREE_LAT = 111.045
+
+
+def _bounding_box(lat: float, lng: float, radius_km: float):
+    """
+    Lat/lng box that contains the search circle, as
+    (min_lat, max_lat, [(min_lng, max_lng), ...]). Longitude ranges are split
+    when the box crosses the antimeridian and dropped near the poles.
+    """
+    dlat = radius_km / KM_PER_DEGREE_LAT
+    min_lat, max_lat = max(lat - dlat, -90.0), min(lat + dlat, 90.0)
+
+    cos_lat = math.cos(math.radians(lat))
+    if min_lat <= -90.0 or max_lat >= 90.0 or cos_lat < 1e-6:
+        return min_lat, max_lat, []
+
+    dlng = radius_km / (KM_PER_DEGREE_LAT * cos_lat)
+    if dlng >= 180.0:
+        return min_lat, max_lat, []
+
+    min_lng, max_lng = lng - dlng, lng + dlng
+    if min_lng < -180.0:
+        return min_lat, max_lat, [(min_lng + 360.0, 180.0), (-180.0, max_lng)]
+    if max_lng > 180.0:
+        return min_lat, max_lat, [(min_lng, 180.0), (-180.0, max_lng - 360.0)]
+    return min_lat, max_lat, [(min_lng, max_lng)]
+
+
+def _haversine_km(lat: float, lng: float):
+    """Great-circle distance from (lat, lng) to each gym, in km"""
+    gym_lat = func.radians(cast(Gym.latitude, Float))
+    gym_lng = func.radians(cast(Gym.longitude, Float))
+    a = (
+        func.power(func.sin((gym_lat - math.radians(lat)) * 0.5), 2)
+        + math.cos(math.radians(lat))
+        * func.cos(gym_lat)
+        * func.power(func.sin((gym_lng - math.radians(lng)) * 0.5), 2)
+    )
+    # asin form stays accurate for short distances; least() guards rounding above 1
+    return 2 * EARTH_RADIUS_KM * func.asin(func.sqrt(func.least(a, 1.0)))
+
+
+def _postgis_distance_km(lat: float, lng: float):
+    gym_point = func.geography(func.ST_MakePoint(cast(Gym.longitude, Float), cast(Gym.latitude, Float)))
+    origin = func.geography(func.ST_MakePoint(lng, lat))
+    return gym_point, origin, func.ST_Distance(gym_point, origin) / 1000.0
+
+
+def _nearby_gyms(query, lat: float, lng: float, radius_km: float):
+    """
+    Restrict `query` to gyms within radius_km. The exact
+    distance is computed once per candidate in a subquery and only for rows
+    that pass an index-backed prefilter: ST_DWithin on the geography index
+    with PostGIS, otherwise the lat/lng bounding box.
+    """
+    if settings.GEO_BACKEND == "postgis":
+        gym_point, origin, distance = _postgis_distance_km(lat, lng)
+        prefilter = [func.ST_DWithin(gym_point, origin, radius_km * 1000.0)]
+    else:
+        distance = _haversine_km(lat, lng)
+        min_lat, max_lat, lng_ranges = _bounding_box(lat, lng, radius_km)
+        prefilter = [Gym.latitude.between(min_lat, max_lat)]
+        if lng_ranges:
+            prefilter.append(or_(*(Gym.longitude.between(lo, hi) for lo, hi in lng_ranges)))
+
+    candidates = (
+        select(Gym.gym_id, distance.label("distance_km"))
+        .where(Gym.latitude.isnot(None), Gym.longitude.isnot(None), *prefilter)
+        .subquery()
+    )
+
+    query = (
+        query.join(candidates, candidates.c.gym_id == Gym.gym_id)
+        .filter(candidates.c.distance_km <= radius_km)
+    )
+    return query, candidates.c.distance_km
+
+
+def _as_tags(value) -> List[str]:
+    if not value:
+        return []
+    if isinstance(value, str):
+        return [value]
+    return [tag for tag in value if tag]
+
+
+def _tag_filter(column, tags: List[str], match: str):
+    # Both operators are served by the column's GIN index
+    if match == "any":
+        return column.has_any(array(tags))
+    return column.contains(tags)
+
+
+def _filter_gyms(
+    query,
     status: Optional[str] = "active",
     subscription_tier: Optional[str] = None,
-    equipment: Optional[str] = None,
-    facility: Optional[str] = None,
+    equipment=None,
+    facility=None,
+    tag_match: str = "all",
     min_capacity: Optional[int] = None,
     lat: Optional[float] = None,
     lng: Optional[float] = None,
-    radius_km: Optional[float] = None
-) -> Tuple[List[Gym], int]:
-
-    query = db.query(Gym)
+    radius_km: Optional[float] = None,
+):
+    """Apply the /gyms filters; returns (query, distance column or None)"""
 
     # Filter by status
     if status:
@@ -63,36 +188,150 @@ def get_gyms(
     if subscription_tier:
         query = query.filter(Gym.subscription_tier == subscription_tier)
 
-    # Filter by equipment / facility
-    if equipment:
-        query = query.filter(Gym.equipment.contains([equipment]))
-    if facility:
-        query = query.filter(Gym.facilities.contains([facility]))
+    # Filter by equipment / facility tags (all or any of them)
+    equipment_tags = _as_tags(equipment)
+    if equipment_tags:
+        query = query.filter(_tag_filter(Gym.equipment, equipment_tags, tag_match))
+    facility_tags = _as_tags(facility)
+    if facility_tags:
+        query = query.filter(_tag_filter(Gym.facilities, facility_tags, tag_match))
 
     # Filter by capacity
     if min_capacity:
         query = query.filter(Gym.capacity >= min_capacity)
 
-    # Proximity filter (Haversine formula)
+    # Proximity filter: index prefilter, then exact distance
+    distance = None
     if lat is not None and lng is not None and radius_km is not None:
-        distance = (
-            6371
-            * func.acos(
-                func.cos(func.radians(lat))
-                * func.cos(func.radians(Gym.latitude))
-                * func.cos(func.radians(Gym.longitude) - func.radians(lng))
-                + func.sin(func.radians(lat)) * func.sin(func.radians(Gym.latitude))
-            )
+        query, distance = _nearby_gyms(query, lat, lng, radius_km)
+
+    return query, distance
+
+
+def _paginate(query, keys, kind: str, types, key_of, skip: int, limit: int, cursor: Optional[str]):
+    """
+    Order `query` by `keys` ((column, descending) pairs, ending in a unique
+    column) and fetch one page: after `cursor` by keyset when given, else at
+    `skip`. Returns (rows, next_cursor); key_of(row) gives a row's key values.
+    """
+    if cursor:
+        query = query.filter(keyset_after(keys, decode_keyset(cursor, kind, types)))
+    query = query.order_by(*[column.desc() if desc else column for column, desc in keys])
+    if not cursor:
+        query = query.offset(skip)
+
+    # One extra row tells whether another page exists
+    rows = query.limit(limit + 1).all()
+
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = encode_keyset(kind, key_of(rows[-1]))
+    return rows, next_cursor
+
+
+def get_gyms(
+    db: Session,
+    skip: int = 0,
+    limit: int = 10,
+    status: Optional[str] = "active",
+    subscription_tier: Optional[str] = None,
+    equipment: Optional[List[str]] = None,
+    facility: Optional[List[str]] = None,
+    min_capacity: Optional[int] = None,
+    lat: Optional[float] = None,
+    lng: Optional[float] = None,
+    radius_km: Optional[float] = None,
+    tag_match: str = "all",
+    with_total: str = "exact",
+    cursor: Optional[str] = None,
+) -> Tuple[List[Gym], Optional[int], bool, Optional[str]]:
+
+    query, distance = _filter_gyms(
+        db.query(Gym),
+        status=status,
+        subscription_tier=subscription_tier,
+        equipment=equipment,
+        facility=facility,
+        tag_match=tag_match,
+        min_capacity=min_capacity,
+        lat=lat,
+        lng=lng,
+        radius_km=radius_km,
+    )
+
+    total, total_estimated = count_total(db, query, with_total)
+
+    if distance is not None:
+        rows, next_cursor = _paginate(
+            query.add_columns(distance),
+            keys=[(distance, False), (Gym.gym_id, False)],
+            kind="near",
+            types=(float, str),
+            key_of=lambda row: (row[1], row[0].gym_id),
+            skip=skip,
+            limit=limit,
+            cursor=cursor,
         )
-        query = query.filter(distance <= radius_km)
-        query = query.order_by(distance)
 
-    total = query.count()
-    gyms = query.offset(skip).limit(limit).all()
-    return gyms, total
+        gyms = []
+        for gym, distance_km in rows:
+            # Not a column; picked up by GymResponse.distance_km
+            gym.distance_km = round(distance_km, 3)
+            gyms.append(gym)
+        return gyms, total, total_estimated, next_cursor
+
+    gyms, next_cursor = _paginate(
+        query,
+        keys=[(Gym.created_at, True), (Gym.gym_id, True)],
+        kind="new",
+        types=(datetime.fromisoformat, str),
+        key_of=lambda gym: (gym.created_at, gym.gym_id),
+        skip=skip,
+        limit=limit,
+        cursor=cursor,
+    )
+    return gyms, total, total_estimated, next_cursor
+
+
+def get_gym_facets(db: Session, **filters) -> dict:
+    """
+    Per-tag gym counts for equipment and facilities under the same filters
+    as get_gyms, in a single query: {"equipment": [(tag, count), ...], ...}.
+    """
+
+    query, _ = _filter_gyms(db.query(Gym.gym_id, Gym.equipment, Gym.facilities), **filters)
+    # CTE: referenced by both branches, so Postgres materializes it once
+    matching = query.cte("matching")
+
+    def facet(name: str, column):
+        tag = func.jsonb_array_elements_text(column).table_valued("value").lateral()
+        return (
+            select(literal(name).label("facet"), tag.c.value.label("value"), func.count().label("count"))
+            .select_from(matching)
+            .join(tag, true())
+            .group_by(tag.c.value)
+        )
+
+    rows = db.execute(
+        union_all(facet("equipment", matching.c.equipment), facet("facilities", matching.c.facilities))
+        .order_by(text("facet"), text("count DESC"), text("value"))
+    ).all()
+
+    facets = {"equipment": [], "facilities": []}
+    for name, value, count in rows:
+        facets[name].append((value, count))
+    return facets
 
 
-def search_gyms(db: Session, q: str, skip: int = 0, limit: int = 10) -> Tuple[List[Gym], int]:
+def search_gyms(
+    db: Session,
+    q: str,
+    skip: int = 0,
+    limit: int = 10,
+    with_total: str = "exact",
+    cursor: Optional[str] = None,
+) -> Tuple[List[Gym], Optional[int], bool, Optional[str]]:
     query = db.query(Gym).filter(
         or_(
             Gym.name.ilike(f"%{q}%"),
@@ -105,9 +344,91 @@ def search_gyms(db: Session, q: str, skip: int = 0, limit: int = 10) -> Tuple[Li
     # Only active gyms by default
     query = query.filter(Gym.status == "active")
 
-    total = query.count()
-    gyms = query.offset(skip).limit(limit).all()
-    return gyms, total
+    total, total_estimated = count_total(db, query, with_total)
+    gyms, next_cursor = _paginate(
+        query,
+        keys=[(Gym.name, False), (Gym.gym_id, False)],
+        kind="name",
+        types=(str, str),
+        key_of=lambda gym: (gym.name, gym.gym_id),
+        skip=skip,
+        limit=limit,
+        cursor=cursor,
+    )
+    return gyms, total, total_estimated, next_cursor
+
+
+def _prefix_tsquery(q: str) -> Optional[str]:
+    """
+    Turn free text into a tsquery where every word is a prefix match
+    ("iron gy" -> "iron:* & gy:*"), so results update as the user types.
+    Only word characters survive, which keeps tsquery syntax out of user input.
+    """
+    words = re.findall(r"\w+", q.lower())
+    if not words:
+        return None
+    return " & ".join(f"{word}:*" for word in words)
+
+
+def search_gyms_fulltext(
+    db: Session,
+    q: str,
+    skip: int = 0,
+    limit: int = 10,
+    with_total: str = "exact",
+    cursor: Optional[str] = None,
+) -> Tuple[List[Gym], Optional[int], bool, Optional[str]]:
+    """
+    Ranked full-text search over the gyms.search_vector document (GIN
+    indexed). Each returned gym carries `search_rank` and a highlighted
+    `snippet` of its name, address and facilities.
+    """
+    tsquery_text = _prefix_tsquery(q)
+    if tsquery_text is None:
+        return [], (None if with_total == "false" else 0), False, None
+
+    tsquery = func.to_tsquery("simple", tsquery_text)
+    query = (
+        db.query(Gym)
+        .filter(Gym.search_vector.op("@@")(tsquery))
+        .filter(Gym.status == "active")
+    )
+
+    total, total_estimated = count_total(db, query, with_total)
+
+    rank = func.ts_rank_cd(Gym.search_vector, tsquery)
+    document = func.concat_ws(
+        " · ",
+        Gym.name,
+        Gym.address,
+        func.translate(cast(Gym.facilities, String), '[]"', ""),
+        func.translate(cast(Gym.equipment, String), '[]"', ""),
+    )
+    snippet = func.ts_headline(
+        "simple",
+        document,
+        tsquery,
+        "StartSel=<mark>, StopSel=</mark>, MaxWords=20, MinWords=5, MaxFragments=2",
+    )
+
+    rows, next_cursor = _paginate(
+        query.add_columns(rank.label("rank"), snippet.label("snippet")),
+        keys=[(rank, True), (Gym.name, False), (Gym.gym_id, False)],
+        kind="rank",
+        types=(float, str, str),
+        key_of=lambda row: (row[1], row[0].name, row[0].gym_id),
+        skip=skip,
+        limit=limit,
+        cursor=cursor,
+    )
+
+    gyms = []
+    for gym, gym_rank, gym_snippet in rows:
+        # Not columns; picked up by GymResponse
+        gym.search_rank = round(gym_rank, 6)
+        gym.snippet = gym_snippet
+        gyms.append(gym)
+    return gyms, total, total_estimated, next_cursor
 
 
 def list_gym_staff(db: Session, gym_id: str):
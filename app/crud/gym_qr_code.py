@@ -1,7 +1,11 @@
+from sqlalchemy import and_, select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 from uuid import uuid4
 from datetime import datetime
-from app.models.gyms import GymQRCode
+from typing import Optional, Tuple
+from app.core.qr_registry import GymQR, qr_registry
+from app.models.gyms import Gym, GymQRCode
 from app.models.files import File
 from app.services import qr_service
 
@@ -78,3 +82,37 @@ def get_active_qr_for_gym(db, gym_id: str, qr_nonce: str):
     )
 
 
+async def load_gym_qr(db: AsyncSession, gym_id: str) -> Optional[GymQR]:
+    """Gym owner and active QR nonce from the database, stored in the registry. None if no such gym."""
+    generation = qr_registry.generation()
+    row = (
+        await db.execute(
+            select(Gym.owner_id, GymQRCode.qr_nonce)
+            .outerjoin(
+                GymQRCode,
+                and_(GymQRCode.gym_id == Gym.gym_id, GymQRCode.is_active == True),
+            )
+            .where(Gym.gym_id == gym_id)
+        )
+    ).first()
+    if row is None:
+        return None
+    return qr_registry.set(gym_id, row.owner_id, row.qr_nonce, generation)
+
+
+async def resolve_checkin_qr(db: AsyncSession, gym_id: str, qr_nonce: str) -> Tuple[Optional[GymQR], bool]:
+    """
+    (gym, whether qr_nonce is its active nonce) for a check-in; gym is None
+    if there is no such gym. Answered from the QR registry when it knows
+    the nonce and its entries are kept in sync across workers; a miss or an
+    unknown nonce is checked against the database, since the registry may
+    not have heard of a rotation yet.
+    """
+    entry = qr_registry.get(gym_id)
+    if qr_registry.trusted and entry is not None and entry.qr_nonce is not None and entry.qr_nonce == qr_nonce:
+        return entry, True
+
+    fresh = await load_gym_qr(db, gym_id)
+    if entry is not None and (fresh is None or fresh.qr_nonce != entry.qr_nonce):
+        qr_registry.record_stale()
+    return fresh, fresh is not None and fresh.qr_nonce is not None and fresh.qr_nonce == qr_nonce
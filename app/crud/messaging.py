@@ -1,18 +1,19 @@
 from datetime import datetime
 from typing import Optional
-from uuid import UUID
+from uuid import UUID, uuid4
 
-from sqlalchemy import and_, desc, or_
+from sqlalchemy import and_, case, desc, func, or_, select, update
+from sqlalchemy.dialects.postgresql import insert
 from sqlalchemy.exc import IntegrityError
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.models.messages import Message
-from app.models.users import User
+from app.core.user_cache import user_profiles
+from app.models.messages import Conversation, Message, conversation_pair
 from app.schemas.messaging import MessageSend
 
 
-def create_message(
-    db: Session,
+async def create_message(
+    db: AsyncSession,
     sender_id: UUID,
     sender_type: str,
     message_data: MessageSend,
@@ -21,11 +22,11 @@ def create_message(
     """Create a new message"""
 
     if receiver_type is None:
-        receiver = db.query(User).filter(User.user_id == str(message_data.receiver_id)).first()
+        receiver = await user_profiles.get_one(db, str(message_data.receiver_id))
         if not receiver:
             raise ValueError("Receiver not found")
         receiver_type = str(receiver.role)
-    
+
     message = Message(
         sender_id=str(sender_id),
         sender_type=str(sender_type).lower(),
@@ -34,112 +35,340 @@ def create_message(
         content=message_data.content,
         file_id=str(message_data.file_id) if message_data.file_id else None
     )
-    
+
     try:
         db.add(message)
-        db.commit()
-        db.refresh(message)
+        await db.flush()
+        await _touch_conversations(
+            db, [(message.message_id, message.sender_id, message.receiver_id, func.now())]
+        )
+        await db.commit()
+        await db.refresh(message)
     except IntegrityError:
-        db.rollback()
+        await db.rollback()
         raise
     return message
 
 
-def get_conversations(db: Session, user_id: UUID) -> list[dict]:
-    """Get list of users the current user has messaged with"""
-    
-    # Find all distinct conversation partners
-    # Messages where current user is sender OR receiver
-    
-    # Get unique user IDs from both sides
-    sent_to = db.query(Message.receiver_id).filter(
-        Message.sender_id == str(user_id)
-    ).distinct().all()
-    
-    received_from = db.query(Message.sender_id).filter(
-        Message.receiver_id == str(user_id)
-    ).distinct().all()
-    
-    # Combine and deduplicate
-    partner_ids = set()
-    for (pid,) in sent_to:
-        partner_ids.add(pid)
-    for (pid,) in received_from:
-        partner_ids.add(pid)
-    
-    conversations = []
-    for partner_id in partner_ids:
-        # Get last message between them
-        last_message = db.query(Message).filter(
+async def create_messages_bulk(db: AsyncSession, rows: list[dict]) -> list[Message]:
+    """
+    Insert many messages with one multi-row INSERT ... RETURNING and update
+    their conversations in the same transaction. Each row carries
+    sender_id/sender_type/receiver_id/receiver_type/content/file_id (and
+    optionally message_id). Rows keep their order: created_at comes from
+    clock_timestamp(), which advances row by row.
+    """
+
+    values = [
+        {
+            "message_id": row.get("message_id") or str(uuid4()),
+            "sender_id": str(row["sender_id"]),
+            "sender_type": str(row["sender_type"]).lower(),
+            "receiver_id": str(row["receiver_id"]),
+            "receiver_type": str(row["receiver_type"]).lower(),
+            "content": row["content"],
+            "file_id": str(row["file_id"]) if row.get("file_id") else None,
+            "created_at": func.clock_timestamp(),
+        }
+        for row in rows
+    ]
+
+    try:
+        result = await db.scalars(insert(Message).values(values).returning(Message))
+        by_id = {m.message_id: m for m in result.all()}
+        messages = [by_id[v["message_id"]] for v in values]
+
+        await _touch_conversations(
+            db, [(m.message_id, m.sender_id, m.receiver_id, m.created_at) for m in messages]
+        )
+        await db.commit()
+    except IntegrityError:
+        await db.rollback()
+        raise
+    return messages
+
+
+async def _touch_conversations(db: AsyncSession, messages: list[tuple]) -> None:
+    """
+    Upsert the conversation rows for new (message_id, sender_id, receiver_id,
+    created_at) tuples, in order, inside the caller's transaction: move each
+    pair's last-message pointer to its newest message and add the new
+    messages to the receivers' unread counters.
+    """
+
+    pairs: dict[tuple[str, str], dict] = {}
+    for message_id, sender_id, receiver_id, created_at in messages:
+        user_a_id, user_b_id = conversation_pair(sender_id, receiver_id)
+        row = pairs.setdefault(
+            (user_a_id, user_b_id),
+            {
+                "conversation_id": str(uuid4()),
+                "user_a_id": user_a_id,
+                "user_b_id": user_b_id,
+                "user_a_unread": 0,
+                "user_b_unread": 0,
+            },
+        )
+        row["last_message_id"] = message_id
+        row["last_message_at"] = created_at
+        if str(receiver_id) == user_a_id:
+            row["user_a_unread"] += 1
+        else:
+            row["user_b_unread"] += 1
+
+    stmt = insert(Conversation).values(list(pairs.values()))
+    # Transactions can commit out of order: never move the pointer back to an
+    # older message than the one already recorded
+    is_newer = or_(
+        Conversation.last_message_at.is_(None),
+        stmt.excluded.last_message_at >= Conversation.last_message_at,
+    )
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[Conversation.user_a_id, Conversation.user_b_id],
+        set_={
+            "last_message_id": case(
+                (is_newer, stmt.excluded.last_message_id),
+                else_=Conversation.last_message_id,
+            ),
+            "last_message_at": case(
+                (is_newer, stmt.excluded.last_message_at),
+                else_=Conversation.last_message_at,
+            ),
+            "user_a_unread": Conversation.user_a_unread + stmt.excluded.user_a_unread,
+            "user_b_unread": Conversation.user_b_unread + stmt.excluded.user_b_unread,
+            "updated_at": func.now(),
+        },
+    )
+    await db.execute(stmt)
+
+
+def _my_unread(user_id: str):
+    return case(
+        (Conversation.user_a_id == user_id, Conversation.user_a_unread),
+        else_=Conversation.user_b_unread,
+    )
+
+
+async def get_conversations(
+    db: AsyncSession,
+    user_id: UUID,
+    limit: Optional[int] = None,
+    before: Optional[tuple[datetime, str]] = None,
+) -> list[dict]:
+    """
+    Get the users the current user has messaged with, newest conversation
+    first, straight from the conversations table.
+
+    `before` is a (last_message_at, conversation_id) keyset cursor of the
+    last conversation on the previous page.
+    """
+
+    uid = str(user_id)
+    partner_id = case(
+        (Conversation.user_a_id == uid, Conversation.user_b_id),
+        else_=Conversation.user_a_id,
+    )
+
+    query = (
+        select(Conversation, Message, partner_id, _my_unread(uid))
+        .outerjoin(Message, Message.message_id == Conversation.last_message_id)
+        .where(or_(Conversation.user_a_id == uid, Conversation.user_b_id == uid))
+        .where(Conversation.last_message_at.is_not(None))
+    )
+
+    if before is not None:
+        before_at, before_id = before
+        query = query.where(
             or_(
-                and_(Message.sender_id == str(user_id), Message.receiver_id == partner_id),
-                and_(Message.sender_id == partner_id, Message.receiver_id == str(user_id))
+                Conversation.last_message_at < before_at,
+                and_(
+                    Conversation.last_message_at == before_at,
+                    Conversation.conversation_id < before_id,
+                ),
             )
-        ).order_by(desc(Message.created_at)).first()
-        
-        # Get partner details
-        partner = db.query(User).filter(User.user_id == partner_id).first()
-        if partner:
-            conversations.append({
-                "user_id": partner.user_id,
-                "user_type": partner.role,
-                "user_name": partner.full_name,
-                "last_message": last_message
-            })
-    
-    # Sort by most recent message
-    def _sort_key(conv: dict) -> tuple[int, float]:
-        last = conv.get("last_message")
-        if not last or not getattr(last, "created_at", None):
-            return (0, 0.0)
-        created_at = last.created_at
-        try:
-            return (1, float(created_at.timestamp()))
-        except Exception:
-            return (1, 0.0)
-
-    conversations.sort(key=_sort_key, reverse=True)
-    
-    return conversations
-
-
-def get_messages(
-    db: Session,
+        )
+
+    query = query.order_by(desc(Conversation.last_message_at), desc(Conversation.conversation_id))
+    if limit is not None:
+        query = query.limit(limit)
+
+    rows = (await db.execute(query)).all()
+
+    # Partner names/roles come from the profile cache (one query for misses)
+    profiles = await user_profiles.get_many(db, [row[2] for row in rows])
+
+    return [
+        {
+            "conversation_id": conversation.conversation_id,
+            "last_message_at": conversation.last_message_at,
+            "user_id": partner_id,
+            "user_type": profiles[partner_id].role,
+            "user_name": profiles[partner_id].full_name,
+            "last_message": last_message,
+            "unread_count": unread_count or 0,
+        }
+        for conversation, last_message, partner_id, unread_count in rows
+        if partner_id in profiles
+    ]
+
+
+async def get_unread_total(db: AsyncSession, user_id: UUID) -> int:
+    """Total unread messages across all of a user's conversations (badge count)"""
+
+    uid = str(user_id)
+    total = await db.scalar(
+        select(func.coalesce(func.sum(_my_unread(uid)), 0))
+        .where(or_(Conversation.user_a_id == uid, Conversation.user_b_id == uid))
+    )
+    return int(total or 0)
+
+
+async def mark_conversation_read(db: AsyncSession, user_id: UUID, other_user_id: UUID) -> int:
+    """Mark every message from other_user to user as read and reset the counter"""
+
+    uid, other = str(user_id), str(other_user_id)
+    user_a_id, user_b_id = conversation_pair(uid, other)
+    in_conversation = and_(Conversation.user_a_id == user_a_id, Conversation.user_b_id == user_b_id)
+
+    # Lock the conversation first: a message sent meanwhile either committed
+    # before this (and is marked read below) or bumps the counter after the
+    # reset, never in between where the reset would swallow it
+    await db.execute(select(Conversation.conversation_id).where(in_conversation).with_for_update())
+
+    result = await db.execute(
+        update(Message)
+        .where(
+            Message.sender_id == other,
+            Message.receiver_id == uid,
+            Message.read_at.is_(None),
+        )
+        .values(read_at=func.now())
+    )
+
+    unread_column = "user_a_unread" if uid == user_a_id else "user_b_unread"
+    await db.execute(
+        update(Conversation)
+        .where(in_conversation)
+        .values({unread_column: 0})
+    )
+
+    await db.commit()
+    return result.rowcount
+
+
+async def get_message_in_conversation(
+    db: AsyncSession,
+    message_id: UUID,
+    user_id: UUID,
+    other_user_id: UUID,
+) -> Optional[Message]:
+    """Get a message only if it belongs to the chat between the two users"""
+
+    return await db.scalar(
+        select(Message).where(
+            Message.message_id == str(message_id),
+            _pair_condition(user_id, other_user_id),
+        )
+    )
+
+
+def _pair_condition(user_id: UUID, other_user_id: UUID):
+    return or_(
+        and_(Message.sender_id == str(user_id), Message.receiver_id == str(other_user_id)),
+        and_(Message.sender_id == str(other_user_id), Message.receiver_id == str(user_id))
+    )
+
+
+async def get_messages(
+    db: AsyncSession,
     user_id: UUID,
     other_user_id: UUID,
     limit: int = 50,
-    offset: int = 0
-) -> tuple[list[Message], int]:
-    """Get paginated messages between two users"""
-    
-    query = db.query(Message).filter(
-        or_(
-            and_(Message.sender_id == str(user_id), Message.receiver_id == str(other_user_id)),
-            and_(Message.sender_id == str(other_user_id), Message.receiver_id == str(user_id))
+    offset: int = 0,
+    before: Optional[tuple[datetime, str]] = None,
+    with_total: bool = True,
+) -> tuple[list[Message], Optional[int]]:
+    """
+    Get paginated messages between two users, newest page first.
+
+    With `before` (the (created_at, message_id) of the oldest message the
+    client already has) the page is read by keyset instead of OFFSET, so
+    scrolling back through a long chat stays cheap. The COUNT is only run
+    when `with_total` is set; otherwise total is None.
+    """
+
+    condition = _pair_condition(user_id, other_user_id)
+
+    total = None
+    if with_total:
+        total = await db.scalar(select(func.count()).select_from(Message).where(condition))
+
+    query = select(Message).where(condition)
+    if before is not None:
+        before_at, before_id = before
+        query = query.where(
+            or_(
+                Message.created_at < before_at,
+                and_(Message.created_at == before_at, Message.message_id < before_id),
+            )
         )
+    else:
+        query = query.offset(offset)
+
+    result = await db.scalars(
+        query.order_by(desc(Message.created_at), desc(Message.message_id)).limit(limit)
     )
-    
-    total = query.count()
-    
-    messages = query.order_by(desc(Message.created_at)).limit(limit).offset(offset).all()
-    
+    messages = list(result.all())
+
     # Reverse to get chronological order (oldest first)
     messages.reverse()
-    
+
     return messages, total
 
 
-def delete_message(db: Session, message_id: UUID, user_id: UUID) -> bool:
+async def delete_message(db: AsyncSession, message_id: UUID, user_id: UUID) -> bool:
     """Delete a message (only if user is the sender)"""
-    
-    message = db.query(Message).filter(
-        Message.message_id == str(message_id),
-        Message.sender_id == str(user_id)
-    ).first()
-    
+
+    message = await db.scalar(
+        select(Message).where(
+            Message.message_id == str(message_id),
+            Message.sender_id == str(user_id)
+        )
+    )
+
     if not message:
         return False
-    
-    db.delete(message)
-    db.commit()
+
+    user_a_id, user_b_id = conversation_pair(message.sender_id, message.receiver_id)
+    conversation = await db.scalar(
+        select(Conversation).where(
+            Conversation.user_a_id == user_a_id,
+            Conversation.user_b_id == user_b_id,
+        )
+    )
+
+    await db.delete(message)
+    await db.flush()
+
+    if conversation is not None:
+        if message.read_at is None:
+            if message.receiver_id == user_a_id:
+                conversation.user_a_unread = max((conversation.user_a_unread or 0) - 1, 0)
+            else:
+                conversation.user_b_unread = max((conversation.user_b_unread or 0) - 1, 0)
+
+        if conversation.last_message_id in (None, message.message_id):
+            # Point at the newest remaining message of the pair
+            latest = await db.scalar(
+                select(Message).where(
+                    or_(
+                        and_(Message.sender_id == user_a_id, Message.receiver_id == user_b_id),
+                        and_(Message.sender_id == user_b_id, Message.receiver_id == user_a_id),
+                    )
+                ).order_by(desc(Message.created_at), desc(Message.message_id)).limit(1)
+            )
+            conversation.last_message_id = latest.message_id if latest else None
+            conversation.last_message_at = latest.created_at if latest else None
+
+    await db.commit()
     return True
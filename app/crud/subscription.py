@@ -1,5 +1,6 @@
 # app/crud/subscription.py
 
+from sqlalchemy import func
 from sqlalchemy.orm import Session
 from app.models.financials import SubscriptionTier
 from app.schemas.subscription import (
@@ -35,6 +36,14 @@ def get_all_tiers(db: Session, active_only: bool = False):
     return query.order_by(SubscriptionTier.display_order).all()
 
 
+def get_tiers_version(db: Session, active_only: bool = False):
+    """(row count, latest updated_at) of the tiers get_all_tiers would return"""
+    query = db.query(func.count(SubscriptionTier.tier_id), func.max(SubscriptionTier.updated_at))
+    if active_only:
+        query = query.filter(SubscriptionTier.is_active == True)
+    return query.one()
+
+
 # ---------- UPDATE ----------
 
 def update_tier(db: Session, tier: SubscriptionTier, tier_in: SubscriptionTierUpdate):
@@ -7,6 +7,7 @@ from datetime import datetime
 from app.models.files import File
 from app.services.cloudinary_service import upload_file
 from app.crud.files import MEDIA_PROJECT_FOLDER
+from app.core.auth_cache import auth_cache
 
 
 def register_or_replace_user_face(db: Session, user: User, file):
@@ -54,11 +55,17 @@ def register_or_replace_user_face(db: Session, user: User, file):
         user.face_file_id = face_file.file_id
 
     user.face_registered_at = datetime.utcnow()
+    # The old face_token describes the old face; check-ins use the image URL
+    # until the new one is enrolled
+    user.face_token = None
+    user.face_faceset_shard = None
 
     db.add(user)
     db.commit()
     db.refresh(user)
 
+    auth_cache.invalidate_user(user.user_id)
+
     return user
 
 
@@ -76,6 +83,7 @@ def mark_email_verified(db: Session, user_id: str):
         user.email_verified = True
         db.commit()
         db.refresh(user)
+        auth_cache.invalidate_user(user_id)
         return user
     return None
 
@@ -1,5 +1,6 @@
 from fastapi import FastAPI
 from app.api.health import router as health_router
+from app.api.metrics import router as metrics_router
 from app.api.v1.auth import router as auth_router
 from app.api.v1.gyms import router as gym_router
 from app.api.v1.users import router as user_router
@@ -12,12 +13,24 @@ from app.api.v1.notifications import router as notifications_router
 from app.api.v1.admin_payouts import router as admin_payouts_router
 from app.api.v1.paystack_webhook import router as paystack_webhook_router
 from app.api.ws.chat import websocket_endpoint
+from app.services.message_batcher import message_batcher
+from app.services.face_id_service import facepp
+from app.services.checkin_verifier import checkin_verifier
 from fastapi.openapi.utils import get_openapi
+from app.core.config import settings
+from app.core.database import SessionLocal
+from app.core.pubsub import pubsub
+from app.core.revocation import revocation_list
+from app.core.query_tracking import QueryTrackingMiddleware, enable_query_tracking
+from app.core.metrics import MetricsMiddleware
+from app.core.compression import CompressionMiddleware
+from app.core.responses import DefaultJSONResponse
 
 app = FastAPI(
     title="Gym Software API",
     version="1.0",
     docs_url="/",
+    default_response_class=DefaultJSONResponse,
 )
 
 
@@ -73,10 +86,13 @@ def custom_openapi():
                 "    }\n"
                 "}\n"
                 "```\n\n"
-                "**2. Keep alive (ping)**\n"
+                "**2. Keep alive (ping, optional)**\n"
                 "```json\n"
                 '{"type": "ping"}\n'
                 "```\n\n"
+                "The server keeps the connection alive with WebSocket protocol pings, "
+                "which WebSocket clients answer automatically; sockets that stop "
+                "answering are closed. An application-level ping is never required.\n\n"
                 "### Messages You Will Receive:\n\n"
                 "**1. New message from someone**\n"
                 "```json\n"
@@ -108,6 +124,24 @@ def custom_openapi():
                 "```json\n"
                 '{"type": "pong"}\n'
                 "```\n\n"
+                "**4. Check-in verdict** (to the member and to the gym owner)\n"
+                "Check-ins are answered with a provisional check-in; this arrives "
+                "once face verification finishes.\n"
+                "```json\n"
+                "{\n"
+                '    "type": "checkin",\n'
+                '    "payload": {\n'
+                '        "checkin_id": "uuid",\n'
+                '        "gym_id": "uuid",\n'
+                '        "user_id": "uuid",\n'
+                '        "status": "confirmed",\n'
+                '        "face_score": 91.2,\n'
+                '        "rejected_reason": null,\n'
+                '        "confirmed_at": "2024-01-01T00:00:00"\n'
+                "    }\n"
+                "}\n"
+                "```\n"
+                "`status` is `confirmed` or `rejected` (with `rejected_reason`).\n\n"
                 "### Error Responses\n"
                 "```json\n"
                 '{"type": "error", "message": "Error description"}\n'
@@ -139,6 +173,53 @@ def custom_openapi():
 
 app.openapi = custom_openapi
 
+if settings.DB_QUERY_TRACKING:
+    enable_query_tracking()
+    app.add_middleware(QueryTrackingMiddleware)
+
+# Added before metrics so response sizes are recorded as sent on the wire
+if settings.COMPRESSION_ENABLED:
+    app.add_middleware(
+        CompressionMiddleware,
+        minimum_size=settings.COMPRESSION_MIN_SIZE,
+        gzip_level=settings.COMPRESSION_GZIP_LEVEL,
+        brotli_quality=settings.COMPRESSION_BROTLI_QUALITY,
+    )
+
+if settings.METRICS_ENABLED:
+    app.add_middleware(MetricsMiddleware)
+    app.include_router(metrics_router)
+
+
+@app.on_event("startup")
+def load_revocations():
+    if settings.AUTH_MODE != "jwt":
+        return
+    db = SessionLocal()
+    try:
+        revocation_list.load_from_db(db)
+    finally:
+        db.close()
+
+
+@app.on_event("startup")
+async def start_realtime():
+    await pubsub.start()
+    await message_batcher.start()
+    await checkin_verifier.start()
+
+
+@app.on_event("shutdown")
+async def stop_realtime():
+    await checkin_verifier.stop()
+    await message_batcher.stop()
+    await pubsub.stop()
+
+
+@app.on_event("shutdown")
+async def close_http_clients():
+    await facepp.aclose()
+
 base = "/api/v1"
 
 app.include_router(health_router, prefix=base + "/health")
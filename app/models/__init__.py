@@ -25,7 +25,7 @@ from .files import File
 # Notifications & Communication
 from .notifications import Notification, NotificationRecipient, DeviceToken
 from .announcements import Announcement, AnnouncementRead
-from .messages import Message
+from .messages import Message, Conversation
 
 # Ratings & Reviews
 from .ratings import Rating
@@ -61,7 +61,7 @@ __all__ = [
     # Communication
     "Notification", "NotificationRecipient", "DeviceToken",
     "Announcement", "AnnouncementRead",
-    "Message",
+    "Message", "Conversation",
     
     # Ratings
     "Rating",
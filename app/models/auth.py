@@ -13,7 +13,7 @@ class Session(Base):
     session_id = Column(String, primary_key=True, default=lambda: str(uuid4()))
     user_id = Column(String, ForeignKey("users.user_id"), nullable=False)
 
-    access_token = Column(String, nullable=False)
+    access_token = Column(String, nullable=False, index=True)
     refresh_token = Column(String, nullable=True)
 
     device_info = Column(String, nullable=True)
@@ -1,12 +1,24 @@
-from sqlalchemy import Column, String, Enum, Boolean, TIMESTAMP, DECIMAL, Text, JSON, Integer, func, ForeignKey
+from sqlalchemy import Column, String, Enum, Boolean, TIMESTAMP, DECIMAL, Text, JSON, Integer, func, ForeignKey, Index, Computed
+from sqlalchemy.dialects.postgresql import JSONB, TSVECTOR
 from uuid import uuid4
 from app.core.database import Base
-from sqlalchemy.orm import relationship, foreign
+from sqlalchemy.orm import relationship, foreign, deferred
 from sqlalchemy import and_
 from app.models.ratings import Rating
 
 
 
+# Weighted search document for /gyms/search?mode=fulltext, kept up to date by
+# Postgres as a generated column: name (A), address (B), facilities and
+# equipment (C). 'simple' config: no stemming, so prefix matching suits names.
+GYM_SEARCH_DOCUMENT = (
+    "setweight(to_tsvector('simple'::regconfig, coalesce(name, '')), 'A') || "
+    "setweight(to_tsvector('simple'::regconfig, coalesce(address, '')), 'B') || "
+    "setweight(to_tsvector('simple'::regconfig, coalesce(facilities, '[]'::jsonb)), 'C') || "
+    "setweight(to_tsvector('simple'::regconfig, coalesce(equipment, '[]'::jsonb)), 'C')"
+)
+
+
 class Gym(Base):
     __tablename__ = "gyms"
 
@@ -23,8 +35,9 @@ class Gym(Base):
     contact_email = Column(String, nullable=True)
     contact_phone = Column(String, nullable=True)
 
-    equipment = Column(JSON, default=[])
-    facilities = Column(JSON, default=[])
+    # JSONB arrays of tags, GIN indexed for @> (all) / ?| (any) filters
+    equipment = Column(JSONB, default=[])
+    facilities = Column(JSONB, default=[])
 
     # NO verification_application_id here - verification is on user level for gym_owner
     # The gym status depends on owner's verification status
@@ -53,6 +66,9 @@ class Gym(Base):
     created_at = Column(TIMESTAMP, server_default=func.now(), nullable=False)
     updated_at = Column(TIMESTAMP, server_default=func.now(), onupdate=func.now(), nullable=False)
 
+    # Deferred: only full-text search reads it
+    search_vector = deferred(Column(TSVECTOR, Computed(GYM_SEARCH_DOCUMENT, persisted=True)))
+
     # Relationships
     owner = relationship("User", foreign_keys=[owner_id], back_populates="owned_gyms")
     
@@ -102,6 +118,16 @@ class Gym(Base):
     payouts_enabled = Column(Boolean, nullable=False, server_default="false")
     payout_recipient_verified_at = Column(TIMESTAMP, nullable=True)
 
+    __table_args__ = (
+        # Bounding-box prefilter for proximity search
+        Index("ix_gyms_location", "latitude", "longitude"),
+        Index("ix_gyms_search_vector", "search_vector", postgresql_using="gin"),
+        Index("ix_gyms_equipment", "equipment", postgresql_using="gin"),
+        Index("ix_gyms_facilities", "facilities", postgresql_using="gin"),
+        # Default /gyms order (newest first) and its keyset cursor
+        Index("ix_gyms_created_at", "created_at", "gym_id"),
+    )
+
 
 
 
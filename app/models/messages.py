@@ -6,8 +6,10 @@ from sqlalchemy import (
     Enum,
     Text,
     TIMESTAMP,
+    Integer,
     func,
     Index,
+    UniqueConstraint,
 )
 from uuid import uuid4
 from sqlalchemy.orm import relationship
@@ -54,5 +56,58 @@ class Message(Base):
     __table_args__ = (
         Index("ix_messages_sender", "sender_id"),
         Index("ix_messages_receiver", "receiver_id"),
-        Index("ix_messages_conversation", "sender_id", "receiver_id"),
+        # Covers both directions of a chat and its (created_at, message_id) keyset
+        Index("ix_messages_conversation", "sender_id", "receiver_id", "created_at", "message_id"),
     )
+
+
+class Conversation(Base):
+    """
+    One row per pair of users who have exchanged messages, keyed by the
+    ordered pair (user_a_id < user_b_id). Keeps a pointer to the latest
+    message and per-participant unread counters so inbox listings and
+    unread badges don't have to scan `messages`.
+    """
+    __tablename__ = "conversations"
+
+    conversation_id = Column(String, primary_key=True, default=lambda: str(uuid4()))
+
+    user_a_id = Column(
+        String,
+        ForeignKey("users.user_id", ondelete="CASCADE"),
+        nullable=False,
+    )
+    user_b_id = Column(
+        String,
+        ForeignKey("users.user_id", ondelete="CASCADE"),
+        nullable=False,
+    )
+
+    last_message_id = Column(
+        String,
+        ForeignKey("messages.message_id", ondelete="SET NULL"),
+        nullable=True,
+    )
+    last_message_at = Column(TIMESTAMP, nullable=True)
+
+    user_a_unread = Column(Integer, nullable=False, server_default="0")
+    user_b_unread = Column(Integer, nullable=False, server_default="0")
+
+    created_at = Column(TIMESTAMP, server_default=func.now(), nullable=False)
+    updated_at = Column(TIMESTAMP, server_default=func.now(), onupdate=func.now(), nullable=False)
+
+    user_a = relationship("User", foreign_keys=[user_a_id])
+    user_b = relationship("User", foreign_keys=[user_b_id])
+    last_message = relationship("Message", foreign_keys=[last_message_id])
+
+    __table_args__ = (
+        UniqueConstraint("user_a_id", "user_b_id", name="uq_conversations_pair"),
+        Index("ix_conversations_user_a_recent", "user_a_id", "last_message_at"),
+        Index("ix_conversations_user_b_recent", "user_b_id", "last_message_at"),
+    )
+
+
+def conversation_pair(user_id: str, other_user_id: str) -> tuple[str, str]:
+    """Ordered (user_a_id, user_b_id) key of a conversation."""
+    a, b = str(user_id), str(other_user_id)
+    return (a, b) if a < b else (b, a)
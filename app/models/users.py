@@ -1,4 +1,4 @@
-from sqlalchemy import Column, String, Enum, Boolean, TIMESTAMP, ForeignKey, func
+from sqlalchemy import Column, String, Enum, Boolean, Integer, TIMESTAMP, ForeignKey, func
 from uuid import uuid4
 from app.core.database import Base
 from sqlalchemy.orm import relationship
@@ -53,6 +53,10 @@ class User(Base):
     created_at = Column(TIMESTAMP, server_default=func.now(), nullable=False)
     updated_at = Column(TIMESTAMP, server_default=func.now(), onupdate=func.now(), nullable=False)
     face_registered_at = Column(TIMESTAMP, nullable=True)
+    # Face++ face_token of the registered face, kept alive in FaceSet shard
+    # face_faceset_shard (see face_template_service)
+    face_token = Column(String, nullable=True)
+    face_faceset_shard = Column(Integer, nullable=True)
 
     # Relationships
     profile_file = relationship("File", foreign_keys=[profile_file_id])
@@ -49,16 +49,35 @@ class GymResponse(BaseModel):
     average_rating: float
     total_ratings: int
 
+    # Only set for proximity searches (lat/lng/radius_km)
+    distance_km: Optional[float] = None
+
+    # Only set for /gyms/search?mode=fulltext
+    search_rank: Optional[float] = None
+    snippet: Optional[str] = None
+
     class Config:
         from_attributes = True
 
 class GymListResponse(BaseModel):
     gyms: List[GymResponse]
-    total: int
+    # None with with_total=false; approximate with with_total=estimate
+    total: Optional[int]
+    total_estimated: bool = False
+    # Pass back as ?cursor= for the next page; None on the last page
+    next_cursor: Optional[str] = None
 
     class Config:
         from_attributes = True
 
+class GymFacetCount(BaseModel):
+    value: str
+    count: int
+
+class GymFacetsResponse(BaseModel):
+    equipment: List[GymFacetCount]
+    facilities: List[GymFacetCount]
+
 class GymUpdate(BaseModel):
     name: Optional[str]
     address: Optional[str]
@@ -107,6 +126,10 @@ class GymPhotoResponse(BaseModel):
     class Config:
         orm_mode = True
 
+class GymDetailResponse(GymResponse):
+    # Primary photo first, then display_order
+    photos: List[GymPhotoResponse] = []
+
 class GymDocumentResponse(BaseModel):
     gym_document_id: str
     gym_id: str
@@ -38,10 +38,17 @@ class ConversationPreview(BaseModel):
     user_type: UserRole
     user_name: str
     last_message: Optional[MessageResponse] = None
+    unread_count: int = 0
+
+
+class UnreadCountResponse(BaseModel):
+    unread_count: int
 
 
 class ConversationResponse(BaseModel):
     messages: list[MessageResponse]
-    total: int
+    total: Optional[int] = None
     limit: int
     offset: int
+    has_more: bool = False
+    next_before: Optional[UUID] = None
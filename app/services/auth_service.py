@@ -6,8 +6,12 @@ from app.models.users import User
 from app.crud.user import get_user_by_email
 from app.core.security import verify_password, create_refresh_token
 from app.core.jwt import create_access_token
+from app.core.auth_cache import auth_cache
+from app.core.revocation import revocation_list
 from fastapi import HTTPException, status
 from datetime import datetime, timedelta
+from uuid import uuid4
+import time
 from app.models.auth import Session
 
 def login_user(db: DBSession, email: str, password: str):
@@ -37,10 +41,12 @@ def login_user(db: DBSession, email: str, password: str):
             detail="User account is inactive"
         )
 
-    access_token = create_access_token(subject=str(user.user_id))
+    session_id = str(uuid4())
+    access_token = create_access_token(subject=str(user.user_id), session_id=session_id)
     refresh_token = create_refresh_token()
 
     session = Session(
+        session_id=session_id,
         user_id=user.user_id,
         access_token=access_token,      
         refresh_token=refresh_token,    # REQUIRED
@@ -91,7 +97,11 @@ def refresh_access_token(db: DBSession, refresh_token: str):
     if not session:
         raise HTTPException(status_code=401, detail="Invalid refresh token")
 
-    new_access = create_access_token(subject=str(session.user_id))
+    # Old access token must stop resolving immediately
+    auth_cache.invalidate_session(session.session_id)
+    revocation_list.revoke_tokens_before(session.session_id, time.time())
+
+    new_access = create_access_token(subject=str(session.user_id), session_id=session.session_id)
     new_refresh = create_refresh_token()
 
     session.access_token = new_access
@@ -122,3 +132,6 @@ def logout(db: DBSession, refresh_token: str):
 
     session.is_active = False
     db.commit()
+
+    auth_cache.invalidate_session(session.session_id)
+    revocation_list.revoke_session(session.session_id)
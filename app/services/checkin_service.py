@@ -1,22 +1,21 @@
 # app/services/checkin_service.py
-from sqlalchemy.orm import Session
+import asyncio
+
+from sqlalchemy.ext.asyncio import AsyncSession
 from fastapi import HTTPException, status
-from datetime import datetime, timedelta
 
+from app.crud.checkins import create_provisional_checkin
+from app.crud.gym_qr_code import resolve_checkin_qr
 from app.models.checkins import Checkin
-from app.models.gyms import Gym
+from app.models.files import File
 from app.models.users import User
-from app.crud.gym_qr_code import get_active_qr_for_gym
-from app.services.face_id_service import compare_faces
+from app.services.checkin_verifier import VerificationJob, checkin_verifier
 from datetime import date
-from sqlalchemy import func
-
-
-FACE_MATCH_THRESHOLD = 75.0
+from sqlalchemy import func, select
 
 
-def perform_checkin(
-    db: Session,
+async def perform_checkin(
+    db: AsyncSession,
     *,
     user: User,
     gym_id: str,
@@ -25,26 +24,51 @@ def perform_checkin(
     client_lat: float | None,
     client_lng: float | None,
 ):
-    gym = db.query(Gym).filter(Gym.gym_id == gym_id).first()
+    """
+    Phase one of a check-in: validate, store a provisional check-in and hand
+    face verification to the background verifier. The caller gets the
+    provisional check-in right away; the verdict is pushed over WebSocket/FCM
+    once Face++ has answered.
+    """
+    if checkin_verifier.is_full():
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Check-ins are busy, please try again",
+        )
+
+    # Gym existence, owner and QR validity in one registry lookup
+    gym, qr_valid = await resolve_checkin_qr(db, gym_id, qr_nonce)
     if not gym:
         raise HTTPException(status_code=404, detail="Gym not found")
+    if not qr_valid:
+        raise HTTPException(status_code=400, detail="Invalid or expired QR code")
 
-    qr = get_active_qr_for_gym(db, gym_id, qr_nonce)
-    if not qr:
-        raise HTTPException(status_code=400, detail="Invalid QR code")
-
-    if not user.face_file or not user.face_file.storage_url:
+    # Read here rather than through user.face_file, which would lazy-load
+    # on the (sync) session the user came from. face_token is read fresh too:
+    # the cached user may predate its enrollment.
+    face_url, face_token = None, None
+    if user.face_file_id:
+        row = (
+            await db.execute(
+                select(File.storage_url, User.face_token)
+                .join(User, User.face_file_id == File.file_id)
+                .where(User.user_id == user.user_id)
+            )
+        ).first()
+        if row:
+            face_url, face_token = row
+    if not face_url:
         raise HTTPException(status_code=400, detail="User face not registered")
-    
-    already_checked_in = (
-        db.query(Checkin)
-        .filter(
+
+    already_checked_in = await db.scalar(
+        select(Checkin.checkin_id)
+        .where(
             Checkin.user_id == user.user_id,
             Checkin.gym_id == gym_id,
             Checkin.status == "confirmed",
             func.date(Checkin.created_at) == date.today(),
         )
-        .first()
+        .limit(1)
     )
 
     if already_checked_in:
@@ -53,37 +77,38 @@ def perform_checkin(
             detail="User already checked in today"
         )
 
-
-    checkin = Checkin(
-        user_id=user.user_id,
-        gym_id=gym_id,
-        qr_nonce=qr_nonce,
-        client_lat=client_lat,
-        client_lng=client_lng,
-        status="provisional",
-    )
-    db.add(checkin)
-    db.flush()
-
     try:
-        score = compare_faces(user.face_file.storage_url, face_image_base64)
-        checkin.face_score = score
-
-        if score >= FACE_MATCH_THRESHOLD:
-            checkin.status = "confirmed"
-            checkin.confirmed_at = datetime.utcnow()
-        else:
-            checkin.status = "rejected"
-            checkin.rejected_reason = "Face mismatch"
+        checkin = await create_provisional_checkin(
+            db,
+            user_id=user.user_id,
+            gym_id=gym_id,
+            qr_nonce=qr_nonce,
+            client_lat=client_lat,
+            client_lng=client_lng,
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
 
-    except Exception as e:
+    try:
+        checkin_verifier.submit(
+            VerificationJob(
+                checkin_id=checkin.checkin_id,
+                user_id=str(user.user_id),
+                gym_id=gym_id,
+                owner_id=gym.owner_id,
+                face_url=face_url,
+                face_token=face_token,
+                face_image_base64=face_image_base64,
+            )
+        )
+    except asyncio.QueueFull:
+        # Filled up since the check above
         checkin.status = "rejected"
-        checkin.rejected_reason = str(e)
-        db.commit()
-        raise
-
-    finally:
-        db.commit()
-        db.refresh(checkin)
+        checkin.rejected_reason = "Check-ins are busy, please try again"
+        await db.commit()
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail=checkin.rejected_reason,
+        )
 
     return checkin
@@ -0,0 +1,236 @@
+# app/services/checkin_verifier.py
+import asyncio
+import logging
+from typing import Optional
+
+from fastapi.concurrency import run_in_threadpool
+
+from app.api.ws.connection_manager import manager
+from app.core.config import settings
+from app.core.database import AsyncSessionLocal, SessionLocal
+from app.crud import checkins as crud
+from app.services.face_id_service import FaceServiceError, FaceServiceUnavailable, compare_faces
+from app.services.face_template_service import drop_face_template
+from app.services.fcm_service import fcm_service
+
+logger = logging.getLogger(__name__)
+
+FACE_MATCH_THRESHOLD = 75.0
+
+# How often provisional check-ins whose verification was lost are expired
+EXPIRY_SWEEP_SECONDS = 60
+
+
+class VerificationJob:
+    __slots__ = ("checkin_id", "user_id", "gym_id", "owner_id", "face_url", "face_token", "face_image_base64")
+
+    def __init__(
+        self,
+        checkin_id: str,
+        user_id: str,
+        gym_id: str,
+        owner_id: Optional[str],
+        face_url: str,
+        face_token: Optional[str],
+        face_image_base64: str,
+    ):
+        self.checkin_id = checkin_id
+        self.user_id = user_id
+        self.gym_id = gym_id
+        self.owner_id = owner_id
+        self.face_url = face_url
+        self.face_token = face_token
+        self.face_image_base64 = face_image_base64
+
+
+class CheckinVerifier:
+    """
+    Second phase of a check-in: face verification off the request path.
+
+    The check-in endpoint stores a provisional check-in, submits it here and
+    answers straight away. `workers` tasks take jobs off a bounded queue,
+    compare the probe image with Face++, record the verdict on the
+    provisional row, and push it to the member (WebSocket + FCM) and to the
+    gym owner's front desk (WebSocket). A job that fails outright is
+    rejected (and pushed) so the member can retry; a sweeper expires
+    provisional check-ins that still slip through (e.g. the DB was down).
+    """
+
+    def __init__(self, workers: int = 8, max_queue: int = 500):
+        self.workers = workers
+        self.max_queue = max_queue
+
+        self._queue: "asyncio.Queue[VerificationJob]" = asyncio.Queue(maxsize=max_queue)
+        self._tasks: list[asyncio.Task] = []
+        self._sweeper: Optional[asyncio.Task] = None
+
+    @property
+    def queue_depth(self) -> int:
+        return self._queue.qsize()
+
+    def is_full(self) -> bool:
+        return self._queue.full()
+
+    async def start(self) -> None:
+        if self._tasks:
+            return
+        await self._expire_stale()
+
+        loop = asyncio.get_running_loop()
+        self._tasks = [loop.create_task(self._run()) for _ in range(self.workers)]
+        self._sweeper = loop.create_task(self._sweep())
+
+    async def stop(self) -> None:
+        """Finish queued verifications, then stop the workers."""
+        if not self._tasks:
+            return
+        await self._queue.join()
+        tasks = self._tasks + ([self._sweeper] if self._sweeper else [])
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        self._tasks = []
+        self._sweeper = None
+
+    def submit(self, job: VerificationJob) -> None:
+        """Raises asyncio.QueueFull when verification is backed up."""
+        if not self._tasks:
+            loop = asyncio.get_running_loop()
+            self._tasks = [loop.create_task(self._run()) for _ in range(self.workers)]
+        self._queue.put_nowait(job)
+
+    async def _run(self) -> None:
+        while True:
+            job = await self._queue.get()
+            try:
+                await self._verify(job)
+            except Exception as e:
+                logger.error(f"Verification of check-in {job.checkin_id} failed: {e}")
+                await self._fail(job)
+            finally:
+                self._queue.task_done()
+
+    async def _sweep(self) -> None:
+        while True:
+            await asyncio.sleep(EXPIRY_SWEEP_SECONDS)
+            await self._expire_stale()
+
+    async def _expire_stale(self) -> None:
+        try:
+            async with AsyncSessionLocal() as db:
+                expired = await crud.expire_stale_provisional_checkins(db)
+            if expired:
+                logger.info(f"Expired {expired} provisional check-ins left unverified")
+        except Exception as e:
+            logger.error(f"Could not expire stale provisional check-ins: {e}")
+
+    # -------------------------------------------------
+    # VERIFY
+    # -------------------------------------------------
+    async def _verify(self, job: VerificationJob) -> None:
+        face_score, rejected_reason = None, None
+        try:
+            face_score = await self._compare(job)
+        except FaceServiceUnavailable:
+            rejected_reason = "Face verification is temporarily unavailable, please try again"
+        except FaceServiceError as e:
+            rejected_reason = str(e)
+
+        if face_score is not None and face_score >= FACE_MATCH_THRESHOLD:
+            verdict = "confirmed"
+        else:
+            verdict = "rejected"
+            if rejected_reason is None:
+                rejected_reason = "Face mismatch"
+
+        async with AsyncSessionLocal() as db:
+            checkin = await crud.resolve_provisional_checkin(
+                db,
+                job.checkin_id,
+                status=verdict,
+                face_score=face_score,
+                rejected_reason=rejected_reason,
+            )
+        if checkin is None:
+            logger.info(f"Check-in {job.checkin_id} was no longer provisional; verdict dropped")
+            return
+
+        await self._notify(job, checkin)
+
+    async def _fail(self, job: VerificationJob) -> None:
+        """Reject a check-in whose verification broke, so the member isn't left waiting."""
+        try:
+            async with AsyncSessionLocal() as db:
+                checkin = await crud.resolve_provisional_checkin(
+                    db,
+                    job.checkin_id,
+                    status="rejected",
+                    rejected_reason="Face verification failed, please try again",
+                )
+            if checkin is not None:
+                await self._notify(job, checkin)
+        except Exception as e:
+            # Left provisional; the sweeper expires it
+            logger.error(f"Could not reject check-in {job.checkin_id}: {e}")
+
+    @staticmethod
+    async def _compare(job: VerificationJob) -> float:
+        try:
+            return await compare_faces(job.face_url, job.face_image_base64, face_token=job.face_token)
+        except FaceServiceError as e:
+            if not job.face_token or e.code != "INVALID_FACE_TOKEN":
+                raise
+            # Token expired or left the FaceSet: compare against the image
+            await drop_face_template(job.user_id, job.face_token)
+            return await compare_faces(job.face_url, job.face_image_base64)
+
+    # -------------------------------------------------
+    # NOTIFY
+    # -------------------------------------------------
+    async def _notify(self, job: VerificationJob, checkin) -> None:
+        payload = {
+            "checkin_id": checkin.checkin_id,
+            "gym_id": checkin.gym_id,
+            "user_id": checkin.user_id,
+            "status": checkin.status,
+            "face_score": checkin.face_score,
+            "rejected_reason": checkin.rejected_reason,
+            "confirmed_at": checkin.confirmed_at.isoformat() if checkin.confirmed_at else None,
+        }
+        message = {"type": "checkin", "payload": payload}
+
+        await manager.send_personal_message(message, job.user_id)
+        if job.owner_id:
+            await manager.send_personal_message(message, job.owner_id)
+
+        try:
+            await run_in_threadpool(self._push, job.user_id, checkin.checkin_id, checkin.status, checkin.rejected_reason)
+        except Exception as e:
+            logger.error(f"Check-in push for {checkin.checkin_id} failed: {e}")
+
+    @staticmethod
+    def _push(user_id: str, checkin_id: str, status: str, rejected_reason: Optional[str]) -> None:
+        if status == "confirmed":
+            title, body, notification_type = "Checked in", "Welcome! Your check-in is confirmed.", "info"
+        else:
+            title, body, notification_type = "Check-in rejected", rejected_reason or "Check-in rejected", "alert"
+
+        db = SessionLocal()
+        try:
+            fcm_service.send_to_user(
+                db,
+                user_id,
+                title=title,
+                body=body,
+                notification_type=notification_type,
+                data={"type": "checkin", "checkin_id": checkin_id, "status": status},
+            )
+        finally:
+            db.close()
+
+
+# Singleton instance
+checkin_verifier = CheckinVerifier(
+    workers=settings.CHECKIN_VERIFY_WORKERS,
+    max_queue=settings.CHECKIN_VERIFY_QUEUE_SIZE,
+)
@@ -3,6 +3,7 @@ from typing import Literal
 import cloudinary
 import cloudinary.uploader
 import os
+from app.core.metrics import track_outbound
 
 cloudinary.config(
     cloud_name=os.getenv("CLOUDINARY_CLOUD_NAME"),
@@ -10,6 +11,7 @@ cloudinary.config(
     api_secret=os.getenv("CLOUDINARY_API_SECRET")
 )
 
+@track_outbound("cloudinary", "upload")
 def upload_file(
     file,
     folder: str,
@@ -32,5 +34,6 @@ def upload_file(
 
     return cloudinary.uploader.upload(file, **options)
 
+@track_outbound("cloudinary", "delete")
 def delete_file(public_id: str, resource_type: Literal["image", "raw"] = "image"):
     return cloudinary.uploader.destroy(public_id, resource_type=resource_type)
@@ -1,30 +1,262 @@
 # app/services/face_id_service.py
-import requests
+import asyncio
+import logging
+import random
+from typing import Optional
+
+import httpx
+
+from app.core.circuit_breaker import CircuitBreaker, CircuitOpenError
 from app.core.config import settings
+from app.core.metrics import track_outbound
+
+logger = logging.getLogger(__name__)
+
+FACEPP_API_BASE = "https://api-us.faceplusplus.com/facepp/v3"
+FACEPP_COMPARE_URL = f"{FACEPP_API_BASE}/compare"
+FACEPP_DETECT_URL = f"{FACEPP_API_BASE}/detect"
+FACEPP_FACESET_CREATE_URL = f"{FACEPP_API_BASE}/faceset/create"
+FACEPP_FACESET_ADD_URL = f"{FACEPP_API_BASE}/faceset/addface"
+FACEPP_FACESET_REMOVE_URL = f"{FACEPP_API_BASE}/faceset/removeface"
+
+# Face++ answers 403 with this when our QPS quota is momentarily exhausted
+RETRYABLE_ERRORS = ("CONCURRENCY_LIMIT_EXCEEDED",)
+
+
+class FaceServiceError(Exception):
+    """Face++ could not produce a result for this request."""
+
+    def __init__(self, message: str, code: Optional[str] = None):
+        super().__init__(message)
+        # Face++ error code, e.g. INVALID_FACE_TOKEN
+        self.code = code
+
 
-FACEPP_COMPARE_URL = "https://api-us.faceplusplus.com/facepp/v3/compare"
+class FaceServiceUnavailable(FaceServiceError):
+    """Face++ is down or its circuit is open; the request was not (fully) attempted."""
 
-def compare_faces(stored_image_url: str, image_base64_2: str) -> float:
+
+class _Retryable(Exception):
+    pass
+
+
+class FaceppClient:
     """
-    Returns similarity score.
-    Raises exception on failure.
+    Async Face++ client for the check-in hot path.
+
+    - One pooled httpx.AsyncClient (keep-alive) per event loop
+    - At most `max_concurrency` calls in flight; the rest wait their turn
+    - Transport errors, 5xx, 429 and Face++ concurrency-limit errors are
+      retried up to `retries` times with exponential backoff + full jitter
+    - A circuit breaker fails calls fast while Face++ keeps failing
     """
 
-    payload = {
-        "api_key": settings.FACE_API_KEY,
-        "api_secret": settings.FACE_API_SECRET,
-        "image_url1": stored_image_url,
-        "image_base64_2": image_base64_2,
-    }
+    def __init__(
+        self,
+        api_key: str,
+        api_secret: str,
+        timeout: float = 10.0,
+        max_connections: int = 50,
+        max_concurrency: int = 20,
+        retries: int = 2,
+        backoff_base: float = 0.2,
+        breaker: Optional[CircuitBreaker] = None,
+    ):
+        self.api_key = api_key
+        self.api_secret = api_secret
+        self.timeout = timeout
+        self.max_connections = max_connections
+        self.max_concurrency = max_concurrency
+        self.retries = retries
+        self.backoff_base = backoff_base
+        self.breaker = breaker or CircuitBreaker("facepp")
+
+        self._client: Optional[httpx.AsyncClient] = None
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self.in_flight = 0
+
+    def _ensure_client(self) -> httpx.AsyncClient:
+        loop = asyncio.get_running_loop()
+        if self._client is None or self._loop is not loop:
+            self._loop = loop
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+            self._client = httpx.AsyncClient(
+                timeout=httpx.Timeout(self.timeout, connect=min(self.timeout, 5.0)),
+                limits=httpx.Limits(
+                    max_connections=self.max_connections,
+                    max_keepalive_connections=self.max_connections,
+                ),
+            )
+        return self._client
+
+    async def aclose(self) -> None:
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
 
-    response = requests.post(FACEPP_COMPARE_URL, data=payload, timeout=10)
-    response.raise_for_status()
+    # -------------------------------------------------
+    # API
+    # -------------------------------------------------
+    async def compare(
+        self,
+        image_base64_2: str,
+        image_url1: Optional[str] = None,
+        face_token1: Optional[str] = None,
+    ) -> float:
+        """Similarity (0-100) between a reference face (URL or face_token) and a probe image."""
+        data = {"image_base64_2": image_base64_2}
+        if face_token1:
+            data["face_token1"] = face_token1
+        else:
+            data["image_url1"] = image_url1
 
-    data = response.json()
+        result = await self._post("compare", FACEPP_COMPARE_URL, data)
+        if "confidence" not in result:
+            # e.g. no face found in one of the images
+            raise FaceServiceError("Invalid Face++ response")
+        return float(result["confidence"])
 
-    if "confidence" not in data:
-        raise ValueError("Invalid Face++ response")
+    async def detect(self, image_url: str) -> Optional[str]:
+        """face_token of the largest face in the image, or None if there is no face."""
+        result = await self._post("detect", FACEPP_DETECT_URL, {"image_url": image_url})
+        faces = result.get("faces") or []
+        if not faces:
+            return None
+        # Face++ lists faces by size, largest first
+        return faces[0]["face_token"]
 
-    return float(data["confidence"])
+    async def add_to_faceset(self, outer_id: str, face_token: str) -> None:
+        """
+        Keep a face_token alive: Face++ drops tokens after 72h unless they
+        belong to a FaceSet. The FaceSet is created on first use. A full
+        FaceSet raises FaceServiceError with code QUOTA_EXCEEDED.
+        """
+        data = {"outer_id": outer_id, "face_tokens": face_token}
+        try:
+            result = await self._post("faceset_add", FACEPP_FACESET_ADD_URL, data)
+        except FaceServiceError as e:
+            if e.code != "INVALID_OUTER_ID":
+                raise
+            # force_merge: another worker may have just created it
+            await self._post(
+                "faceset_create",
+                FACEPP_FACESET_CREATE_URL,
+                {"outer_id": outer_id, "force_merge": 1},
+            )
+            result = await self._post("faceset_add", FACEPP_FACESET_ADD_URL, data)
 
+        # Per-token failures (full FaceSet, unknown token) come back as 200s
+        failures = result.get("failure_detail") or []
+        if failures or result.get("face_added") == 0:
+            reason = failures[0].get("reason", "NOT_ADDED") if failures else "NOT_ADDED"
+            raise FaceServiceError(f"Face++ faceset_add: {reason}", code=reason)
 
+    async def remove_from_faceset(self, outer_id: str, face_token: str) -> None:
+        await self._post(
+            "faceset_remove",
+            FACEPP_FACESET_REMOVE_URL,
+            {"outer_id": outer_id, "face_tokens": face_token},
+        )
+
+    # -------------------------------------------------
+    # TRANSPORT
+    # -------------------------------------------------
+    async def _post(self, operation: str, url: str, data: dict) -> dict:
+        client = self._ensure_client()
+        payload = {"api_key": self.api_key, "api_secret": self.api_secret, **data}
+
+        try:
+            self.breaker.before_call()
+        except CircuitOpenError as e:
+            raise FaceServiceUnavailable(str(e))
+
+        try:
+            result = await self._attempt(operation, client, url, payload)
+        except FaceServiceUnavailable:
+            self.breaker.record_failure()
+            raise
+        except BaseException:
+            # Bad request, cancellation or a bug: none of these say anything
+            # about Face++ health, but a half-open trial must not stay claimed
+            self.breaker.release_trial()
+            raise
+
+        self.breaker.record_success()
+        return result
+
+    async def _attempt(self, operation: str, client: httpx.AsyncClient, url: str, payload: dict) -> dict:
+        attempt = 0
+        while True:
+            try:
+                async with self._semaphore:
+                    self.in_flight += 1
+                    try:
+                        with track_outbound("facepp", operation):
+                            try:
+                                response = await client.post(url, data=payload)
+                            except httpx.TransportError as e:
+                                # Timeouts, refused/reset connections
+                                raise _Retryable(repr(e))
+                            return self._parse(response)
+                    finally:
+                        self.in_flight -= 1
+            except _Retryable as e:
+                if attempt >= self.retries:
+                    raise FaceServiceUnavailable(f"Face++ {operation} failed: {e}")
+                attempt += 1
+                delay = random.uniform(0, self.backoff_base * 2 ** attempt)
+                logger.warning(f"Face++ {operation} attempt {attempt} failed ({e}); retrying in {delay:.2f}s")
+                await asyncio.sleep(delay)
+
+    @staticmethod
+    def _parse(response: httpx.Response) -> dict:
+        if response.status_code == 429 or response.status_code >= 500:
+            raise _Retryable(f"HTTP {response.status_code}")
+
+        try:
+            result = response.json()
+        except ValueError:
+            raise _Retryable("malformed response body")
+        if not isinstance(result, dict):
+            raise _Retryable("malformed response body")
+
+        error = result.get("error_message")
+        if error:
+            if any(error.startswith(code) for code in RETRYABLE_ERRORS):
+                raise _Retryable(error)
+            raise FaceServiceError(f"Face++ error: {error}", code=error.split(":")[0].strip())
+
+        if response.status_code >= 400:
+            raise FaceServiceError(f"Face++ HTTP {response.status_code}")
+        return result
+
+
+# Singleton instance
+facepp = FaceppClient(
+    api_key=settings.FACE_API_KEY,
+    api_secret=settings.FACE_API_SECRET,
+    timeout=settings.FACEPP_TIMEOUT_SECONDS,
+    max_connections=settings.FACEPP_MAX_CONNECTIONS,
+    max_concurrency=settings.FACEPP_MAX_CONCURRENCY,
+    retries=settings.FACEPP_RETRIES,
+    breaker=CircuitBreaker(
+        "facepp",
+        failure_threshold=settings.FACEPP_BREAKER_THRESHOLD,
+        reset_timeout=settings.FACEPP_BREAKER_RESET_SECONDS,
+    ),
+)
+
+
+async def compare_faces(
+    stored_image_url: str,
+    image_base64_2: str,
+    face_token: Optional[str] = None,
+) -> float:
+    """
+    Returns similarity score.
+    Compares against the stored face_token when there is one, so Face++
+    doesn't re-fetch and re-detect the reference image.
+    Raises FaceServiceError on failure.
+    """
+    return await facepp.compare(image_base64_2, image_url1=stored_image_url, face_token1=face_token)
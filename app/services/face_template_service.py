@@ -0,0 +1,132 @@
+# app/services/face_template_service.py
+import logging
+from datetime import datetime
+from typing import Optional
+
+from sqlalchemy import func, select, update
+
+from app.core.auth_cache import auth_cache
+from app.core.config import settings
+from app.core.database import AsyncSessionLocal
+from app.core.metrics import registry
+from app.models.users import User
+from app.services.face_id_service import FaceServiceError, facepp
+
+logger = logging.getLogger(__name__)
+
+face_enrollments_total = registry.counter(
+    "face_enrollments_total",
+    "Face template enrollments by outcome (enrolled, no_face, faceset_full, failed, superseded)",
+    ("outcome",),
+)
+
+# A Face++ FaceSet holds at most 10,000 face_tokens, so tokens are spread
+# over numbered FaceSets, filled in order
+MAX_FACESET_SHARDS = 1000
+
+# Lowest shard that may still have room; loaded from the database on first use
+_open_shard: Optional[int] = None
+
+
+def faceset_outer_id(shard: int) -> str:
+    return f"{settings.FACEPP_FACESET_OUTER_ID}-{shard}"
+
+
+async def _current_shard() -> int:
+    global _open_shard
+    if _open_shard is None:
+        async with AsyncSessionLocal() as db:
+            _open_shard = await db.scalar(select(func.max(User.face_faceset_shard))) or 0
+    return _open_shard
+
+
+def _mark_full(shard: int) -> None:
+    global _open_shard
+    logger.warning(f"Face++ FaceSet {faceset_outer_id(shard)} is full; moving to the next one")
+    _open_shard = max(_open_shard or 0, shard + 1)
+
+
+async def _add_to_open_faceset(face_token: str) -> int:
+    """Add the token to the first FaceSet with room; returns its shard."""
+    shard = await _current_shard()
+    while True:
+        try:
+            await facepp.add_to_faceset(faceset_outer_id(shard), face_token)
+            return shard
+        except FaceServiceError as e:
+            if e.code != "QUOTA_EXCEEDED" or shard + 1 >= MAX_FACESET_SHARDS:
+                raise
+        _mark_full(shard)
+        shard += 1
+
+
+async def enroll_face_template(
+    user_id: str,
+    image_url: str,
+    registered_at: datetime,
+    stale_token: Optional[str] = None,
+    stale_shard: Optional[int] = None,
+) -> Optional[str]:
+    """
+    Detect the registered face once and keep its Face++ face_token, so
+    check-ins compare against the token instead of having Face++ re-fetch
+    and re-detect the reference image every time.
+
+    Runs after the registration response. Until it finishes (or if it
+    fails) check-ins compare against the image URL as before.
+    """
+    if stale_token:
+        await forget_face_template(stale_token, stale_shard)
+
+    try:
+        face_token = await facepp.detect(image_url)
+        if face_token is None:
+            logger.warning(f"No face detected in registered face of user {user_id}")
+            face_enrollments_total.inc(outcome="no_face")
+            return None
+        shard = await _add_to_open_faceset(face_token)
+    except FaceServiceError as e:
+        logger.warning(f"Face template enrollment failed for user {user_id}: {e}")
+        face_enrollments_total.inc(outcome="faceset_full" if e.code == "QUOTA_EXCEEDED" else "failed")
+        return None
+
+    async with AsyncSessionLocal() as db:
+        # Only if the face wasn't replaced again while we were enrolling
+        result = await db.execute(
+            update(User)
+            .where(User.user_id == user_id, User.face_registered_at == registered_at)
+            .values(face_token=face_token, face_faceset_shard=shard)
+        )
+        await db.commit()
+
+    if result.rowcount == 0:
+        face_enrollments_total.inc(outcome="superseded")
+        await forget_face_template(face_token, shard)
+        return None
+
+    face_enrollments_total.inc(outcome="enrolled")
+    auth_cache.invalidate_user(user_id)
+    return face_token
+
+
+async def forget_face_template(face_token: str, shard: Optional[int]) -> None:
+    """Remove a replaced face_token from its FaceSet (best effort)."""
+    if shard is None:
+        return
+    try:
+        await facepp.remove_from_faceset(faceset_outer_id(shard), face_token)
+    except FaceServiceError as e:
+        logger.warning(f"Could not remove face_token {face_token} from FaceSet: {e}")
+
+
+async def drop_face_template(user_id: str, face_token: str) -> None:
+    """Forget a face_token Face++ no longer recognises (expired or removed)."""
+    async with AsyncSessionLocal() as db:
+        await db.execute(
+            update(User)
+            .where(User.user_id == user_id, User.face_token == face_token)
+            .values(face_token=None, face_faceset_shard=None)
+        )
+        await db.commit()
+
+    auth_cache.invalidate_user(user_id)
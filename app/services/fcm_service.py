@@ -1,9 +1,11 @@
 import firebase_admin
 from firebase_admin import credentials, messaging
-from sqlalchemy import func
+from sqlalchemy import func, select
 from app.core.config import settings
+from app.core.metrics import track_outbound
 from app.models.notifications import DeviceToken, Notification, NotificationRecipient
-from sqlalchemy.orm import Session
+from sqlalchemy.orm import Session, joinedload
+from sqlalchemy.ext.asyncio import AsyncSession
 from typing import List, Optional
 import logging
 
@@ -75,7 +77,8 @@ class FCMService:
                 ),
             )
 
-            response = messaging.send_multicast(message)
+            with track_outbound("fcm", "send_multicast"):
+                response = messaging.send_multicast(message)
             return {
                 "success": response.success_count,
                 "failed": response.failure_count
@@ -207,26 +210,30 @@ class FCMService:
             return True
         return False
 
-    def get_unread_count(self, db: Session, user_id: str) -> int:
+    async def get_unread_count(self, db: AsyncSession, user_id: str) -> int:
         """Get unread notification count"""
-        return db.query(NotificationRecipient).filter(
-            NotificationRecipient.user_id == user_id,
-            NotificationRecipient.is_read == False
-        ).count()
+        return await db.scalar(
+            select(func.count()).select_from(NotificationRecipient).where(
+                NotificationRecipient.user_id == user_id,
+                NotificationRecipient.is_read == False
+            )
+        )
 
-    def get_notifications(
+    async def get_notifications(
         self,
-        db: Session,
+        db: AsyncSession,
         user_id: str,
         limit: int = 50,
         offset: int = 0
     ) -> List[dict]:
         """Get paginated notifications for a user"""
-        recipients = db.query(NotificationRecipient).filter(
-            NotificationRecipient.user_id == user_id
-        ).order_by(
-            NotificationRecipient.created_at.desc()
-        ).limit(limit).offset(offset).all()
+        recipients = (await db.scalars(
+            select(NotificationRecipient)
+            .options(joinedload(NotificationRecipient.notification))
+            .where(NotificationRecipient.user_id == user_id)
+            .order_by(NotificationRecipient.created_at.desc())
+            .limit(limit).offset(offset)
+        )).all()
         
         result = []
         for r in recipients:
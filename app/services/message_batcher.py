@@ -0,0 +1,162 @@
+import asyncio
+import logging
+import time
+from typing import Optional
+from uuid import UUID
+
+from fastapi import HTTPException, status
+from sqlalchemy.exc import IntegrityError
+
+from app.core.config import settings
+from app.core.database import AsyncSessionLocal
+from app.core.user_cache import user_profiles
+from app.crud import messaging as crud
+from app.models.messages import Message
+from app.schemas.messaging import MessageSend
+
+logger = logging.getLogger(__name__)
+
+
+class _PendingMessage:
+    __slots__ = ("sender_id", "sender_type", "data", "future")
+
+    def __init__(self, sender_id: str, sender_type: str, data: MessageSend, future: asyncio.Future):
+        self.sender_id = sender_id
+        self.sender_type = sender_type
+        self.data = data
+        self.future = future
+
+
+class MessageBatcher:
+    """
+    Write-behind batcher for chat messages arriving over WebSocket.
+
+    Messages submitted within `window_ms` of each other (up to `max_batch`)
+    are validated with one receiver lookup and stored with one multi-row
+    INSERT ... RETURNING in a single transaction. Each submitter's future
+    resolves with its stored Message only after that commit, so acks never
+    get ahead of the database. If the batch insert fails on a constraint,
+    the batch is replayed row by row so only the offending messages fail.
+    At most `max_queue` messages wait for a batch; submit() refuses the rest.
+    """
+
+    def __init__(self, window_ms: int = 5, max_batch: int = 100, max_queue: int = 5000):
+        self.window = window_ms / 1000
+        self.max_batch = max_batch
+        self.max_queue = max_queue
+
+        self._queue: "asyncio.Queue[_PendingMessage]" = asyncio.Queue(maxsize=max_queue)
+        self._worker: Optional[asyncio.Task] = None
+
+    async def start(self) -> None:
+        if self._worker is None:
+            self._worker = asyncio.get_running_loop().create_task(self._run())
+
+    async def stop(self) -> None:
+        """Flush what is queued, then stop the worker."""
+        if self._worker is None:
+            return
+        await self._queue.join()
+        self._worker.cancel()
+        try:
+            await self._worker
+        except asyncio.CancelledError:
+            pass
+        self._worker = None
+
+    def submit(self, sender_id: UUID, sender_type: str, data: MessageSend) -> "asyncio.Future[Message]":
+        """
+        Queue a message; the returned future resolves once it is committed.
+        Raises asyncio.QueueFull when writes are backed up.
+        """
+        if self._worker is None:
+            self._worker = asyncio.get_running_loop().create_task(self._run())
+
+        future = asyncio.get_running_loop().create_future()
+        self._queue.put_nowait(_PendingMessage(str(sender_id), str(sender_type), data, future))
+        return future
+
+    async def _run(self) -> None:
+        while True:
+            batch = [await self._queue.get()]
+            deadline = time.monotonic() + self.window
+            while len(batch) < self.max_batch:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self._queue.get(), timeout=remaining))
+                except asyncio.TimeoutError:
+                    break
+
+            try:
+                await self._flush(batch)
+            except Exception as e:
+                logger.error(f"Message batch of {len(batch)} failed: {e}")
+                for item in batch:
+                    if not item.future.done():
+                        item.future.set_exception(
+                            HTTPException(status_code=500, detail="Failed to send message")
+                        )
+            finally:
+                for _ in batch:
+                    self._queue.task_done()
+
+    async def _flush(self, batch: list[_PendingMessage]) -> None:
+        async with AsyncSessionLocal() as db:
+            receivers = await user_profiles.get_many(db, (item.data.receiver_id for item in batch))
+
+            accepted: list[_PendingMessage] = []
+            rows: list[dict] = []
+            for item in batch:
+                receiver_id = str(item.data.receiver_id)
+                if receiver_id not in receivers:
+                    item.future.set_exception(HTTPException(status_code=404, detail="Receiver not found"))
+                    continue
+                if receiver_id == item.sender_id:
+                    item.future.set_exception(
+                        HTTPException(status_code=400, detail="Cannot send message to yourself")
+                    )
+                    continue
+                accepted.append(item)
+                rows.append({
+                    "sender_id": item.sender_id,
+                    "sender_type": item.sender_type,
+                    "receiver_id": receiver_id,
+                    "receiver_type": receivers[receiver_id].role,
+                    "content": item.data.content,
+                    "file_id": item.data.file_id,
+                })
+
+            if not accepted:
+                return
+
+            try:
+                messages = await crud.create_messages_bulk(db, rows)
+            except IntegrityError:
+                await self._flush_one_by_one(db, accepted, rows)
+                return
+
+        for item, message in zip(accepted, messages):
+            item.future.set_result(message)
+
+    async def _flush_one_by_one(self, db, accepted: list[_PendingMessage], rows: list[dict]) -> None:
+        for item, row in zip(accepted, rows):
+            try:
+                messages = await crud.create_messages_bulk(db, [row])
+                item.future.set_result(messages[0])
+            except IntegrityError:
+                item.future.set_exception(
+                    HTTPException(
+                        status_code=status.HTTP_400_BAD_REQUEST,
+                        detail="Invalid message payload",
+                    )
+                )
+
+
+# Singleton instance
+message_batcher = MessageBatcher(
+    window_ms=settings.WS_BATCH_WINDOW_MS,
+    max_batch=settings.WS_BATCH_MAX_SIZE,
+    max_queue=settings.WS_BATCH_QUEUE_SIZE,
+)
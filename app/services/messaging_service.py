@@ -1,17 +1,19 @@
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.exc import IntegrityError
 from uuid import UUID
 from typing import Optional
 from fastapi import HTTPException, status
 
+from app.core.pagination import decode_cursor, encode_cursor
+from app.core.user_cache import user_profiles
 from app.crud import messaging as crud
 from app.schemas.messaging import MessageSend, MessageResponse, ConversationPreview
-from app.models.users import User
+from app.models.messages import Message
 from app.api.ws.connection_manager import manager
 
 
 class MessagingService:
-    def __init__(self, db: Session):
+    def __init__(self, db: AsyncSession):
         self.db = db
     
     async def send_message(
@@ -23,7 +25,7 @@ class MessagingService:
         """Send a message with authorization"""
         
         # Check if receiver exists
-        receiver = self.db.query(User).filter(User.user_id == str(message_data.receiver_id)).first()
+        receiver = await user_profiles.get_one(self.db, str(message_data.receiver_id))
         if not receiver:
             raise HTTPException(status_code=404, detail="Receiver not found")
         
@@ -33,7 +35,7 @@ class MessagingService:
         
         # Create message
         try:
-            message = crud.create_message(
+            message = await crud.create_message(
                 self.db,
                 sender_id,
                 sender_type,
@@ -46,7 +48,14 @@ class MessagingService:
                 detail="Invalid message payload",
             )
         
-        # Prepare response for broadcast
+        await self.broadcast_message(message)
+        
+        return MessageResponse.model_validate(message)
+    
+    @staticmethod
+    async def broadcast_message(message: Message) -> None:
+        """Push a stored message to the receiver and acknowledge it to the sender"""
+        
         message_response = {
             "type": "message",
             "payload": {
@@ -62,7 +71,7 @@ class MessagingService:
         }
         
         # Broadcast to receiver via WebSocket
-        await manager.send_personal_message(message_response, str(message_data.receiver_id))  # Add await
+        await manager.send_personal_message(message_response, str(message.receiver_id))
 
         # Optional: notify sender (if they have an active WS connection)
         await manager.send_personal_message(
@@ -73,15 +82,26 @@ class MessagingService:
                     "created_at": message.created_at.isoformat(),
                 },
             },
-            str(sender_id),
+            str(message.sender_id),
         )
-        
-        return MessageResponse.model_validate(message)
     
-    def get_conversations(self, user_id: UUID) -> list[ConversationPreview]:
-        """Get all conversations for a user"""
+    async def get_conversations(
+        self,
+        user_id: UUID,
+        limit: int = 50,
+        cursor: Optional[str] = None
+    ) -> tuple[list[ConversationPreview], Optional[str]]:
+        """Get a page of conversations for a user, plus the cursor of the next page"""
         
-        conversations = crud.get_conversations(self.db, user_id)
+        before = decode_cursor(cursor) if cursor else None
+        # Fetch one extra row to know whether another page exists
+        conversations = await crud.get_conversations(self.db, user_id, limit=limit + 1, before=before)
+        
+        next_cursor = None
+        if len(conversations) > limit:
+            conversations = conversations[:limit]
+            last = conversations[-1]
+            next_cursor = encode_cursor(last["last_message_at"], last["conversation_id"])
         
         result = []
         for conv in conversations:
@@ -89,44 +109,84 @@ class MessagingService:
                 user_id=UUID(conv["user_id"]),
                 user_type=conv["user_type"],
                 user_name=conv["user_name"],
-                last_message=MessageResponse.model_validate(conv["last_message"]) if conv["last_message"] else None
+                last_message=MessageResponse.model_validate(conv["last_message"]) if conv["last_message"] else None,
+                unread_count=conv["unread_count"],
             )
             result.append(preview)
         
-        return result
+        return result, next_cursor
+    
+    async def get_unread_count(self, user_id: UUID) -> int:
+        """Total unread messages for the badge"""
+        
+        return await crud.get_unread_total(self.db, user_id)
+    
+    async def mark_conversation_read(self, user_id: UUID, other_user_id: UUID) -> int:
+        """Mark all messages from other_user as read"""
+        
+        return await crud.mark_conversation_read(self.db, user_id, other_user_id)
     
-    def get_conversation(
+    async def get_conversation(
         self,
         user_id: UUID,
         other_user_id: UUID,
         limit: int = 50,
-        offset: int = 0
+        offset: int = 0,
+        before: Optional[UUID] = None,
+        include_total: Optional[bool] = None
     ) -> dict:
-        """Get messages between two users"""
+        """
+        Get messages between two users.
+
+        Pass `before` (a message_id) to page back from that message by keyset
+        instead of offset. The total is counted by default in offset mode and
+        skipped in cursor mode unless include_total is set.
+        """
         
         # Check if other user exists
-        other = self.db.query(User).filter(User.user_id == str(other_user_id)).first()
+        other = await user_profiles.get_one(self.db, str(other_user_id))
         if not other:
             raise HTTPException(status_code=404, detail="User not found")
         
-        messages, total = crud.get_messages(
+        before_key = None
+        if before is not None:
+            anchor = await crud.get_message_in_conversation(self.db, before, user_id, other_user_id)
+            if not anchor:
+                raise HTTPException(status_code=404, detail="Cursor message not found in this conversation")
+            before_key = (anchor.created_at, anchor.message_id)
+            offset = 0
+        
+        if include_total is None:
+            include_total = before is None
+        
+        # Fetch one extra row to know whether older messages exist
+        messages, total = await crud.get_messages(
             self.db,
             user_id,
             other_user_id,
-            limit,
-            offset
+            limit + 1,
+            offset,
+            before=before_key,
+            with_total=include_total
         )
         
+        has_more = len(messages) > limit
+        if has_more:
+            # Oldest row is first after the chronological reverse
+            messages = messages[1:]
+        
         return {
             "messages": [MessageResponse.model_validate(m) for m in messages],
             "total": total,
             "limit": limit,
-            "offset": offset
+            "offset": offset,
+            "has_more": has_more,
+            "next_before": messages[0].message_id if has_more and messages else None
         }
     
-    def delete_message(self, message_id: UUID, user_id: UUID) -> None:
+    async def delete_message(self, message_id: UUID, user_id: UUID) -> None:
         """Delete a message if user is sender"""
         
-        deleted = crud.delete_message(self.db, message_id, user_id)
+        deleted = await crud.delete_message(self.db, message_id, user_id)
         if not deleted:
             raise HTTPException(status_code=404, detail="Message not found or not authorized to delete")
@@ -4,6 +4,7 @@ import hmac
 from decimal import Decimal
 from fastapi import HTTPException
 from app.core.config import settings
+from app.core.metrics import track_outbound
 from typing import Any, Optional
 
 
@@ -38,6 +39,7 @@ class PaystackService:
     # -------------------------------------------------
     # INITIALIZE TRANSACTION
     # -------------------------------------------------
+    @track_outbound("paystack", "initialize_transaction")
     def initialize_transaction(
         self,
         email: str,
@@ -89,6 +91,7 @@ class PaystackService:
     # -------------------------------------------------
     # VERIFY TRANSACTION
     # -------------------------------------------------
+    @track_outbound("paystack", "verify_transaction")
     def verify_transaction(self, reference: str):
         response = requests.get(
             f"{PAYSTACK_BASE_URL}/transaction/verify/{reference}",
@@ -115,6 +118,7 @@ class PaystackService:
     # -------------------------------------------------
     # TRANSFER RECIPIENTS
     # -------------------------------------------------
+    @track_outbound("paystack", "create_transfer_recipient")
     def create_transfer_recipient(
         self,
         *,
@@ -166,6 +170,7 @@ class PaystackService:
 
         return data["data"]
 
+    @track_outbound("paystack", "delete_transfer_recipient")
     def delete_transfer_recipient(self, id_or_code: str) -> dict[str, Any]:
         """
         Delete (deactivate) a Paystack transfer recipient.
@@ -201,6 +206,7 @@ class PaystackService:
     # -------------------------------------------------
     # VERIFY TRANSFER (PAYOUTS)
     # -------------------------------------------------
+    @track_outbound("paystack", "verify_transfer")
     def verify_transfer(self, reference: str) -> dict[str, Any]:
         """
         Verify a Paystack transfer by reference.
@@ -229,6 +235,7 @@ class PaystackService:
     # -------------------------------------------------
     # CREATE TRANSFER (FOR GYM PAYOUTS)
     # -------------------------------------------------
+    @track_outbound("paystack", "create_transfer")
     def create_transfer(self, amount: Decimal, recipient_code: str, reference: str):
         payload = {
             "source": "balance",
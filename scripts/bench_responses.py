@@ -0,0 +1,241 @@
+#!/usr/bin/env python3
+"""
+Compare payload bytes and serialize time for the large list responses.
+
+Synthetic mode (default) builds realistic payloads for each endpoint's
+response schema and measures, per endpoint: stdlib json vs orjson render
+time, and identity / gzip / brotli sizes.
+
+Live mode (--base-url) fetches the endpoints from a running server with
+each Accept-Encoding and reports wire bytes and latency.
+
+Usage (from the repo root):
+    python -m scripts.bench_responses [--items 50] [--repeat 200]
+    python -m scripts.bench_responses --base-url http://localhost:8000 --token JWT --user-id UUID
+    ... --output bench_output.txt
+"""
+import argparse
+import gzip
+import statistics
+import sys
+import time
+from datetime import datetime, timedelta
+from decimal import Decimal
+from uuid import uuid4
+
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+
+from app.core.compression import brotli
+from app.core.config import settings
+from app.core.responses import orjson
+
+ENDPOINTS = (
+    "/api/v1/gyms/",
+    "/api/v1/notifications/inbox",
+    "/api/v1/messages/conversations/{user_id}",
+    "/api/v1/admin/payouts/",
+)
+
+
+# -------------------------------------------------
+# SYNTHETIC PAYLOADS
+# -------------------------------------------------
+def _gyms(n: int):
+    from app.schemas.gyms import GymListResponse
+
+    gyms = [
+        {
+            "gym_id": str(uuid4()),
+            "owner_id": str(uuid4()),
+            "name": f"Iron Paradise {i}",
+            "description": "Fully equipped gym with free weights, cardio area and group classes. " * 2,
+            "address": f"{i} Independence Avenue, Accra",
+            "latitude": 5.6037 + i / 1000,
+            "longitude": -0.1870 - i / 1000,
+            "contact_email": f"gym{i}@example.com",
+            "contact_phone": "+233201234567",
+            "equipment": ["treadmill", "squat rack", "bench press", "rowing machine", "dumbbells"],
+            "facilities": ["showers", "lockers", "parking", "sauna"],
+            "opening_hours": {day: "06:00-22:00" for day in ("mon", "tue", "wed", "thu", "fri", "sat")},
+            "capacity": 120,
+            "status": "active",
+            "subscription_tier": "premium",
+            "average_rating": 4.6,
+            "total_ratings": 87,
+        }
+        for i in range(n)
+    ]
+    return GymListResponse(gyms=gyms, total=n * 20)
+
+
+def _inbox(n: int):
+    now = datetime.utcnow()
+    return {
+        "notifications": [
+            {
+                "notification_id": str(uuid4()),
+                "type": "announcement",
+                "title": "New class schedule",
+                "message": "Our HIIT classes now start at 6:30am on weekdays. See you there!",
+                "image_url": "https://res.cloudinary.com/demo/image/upload/v1/gyms/banner.jpg",
+                "is_read": i % 3 == 0,
+                "data": {"gym_id": str(uuid4()), "announcement_id": str(uuid4())},
+                "created_at": now - timedelta(hours=i),
+            }
+            for i in range(n)
+        ],
+        "unread_count": n // 3,
+        "limit": n,
+        "offset": 0,
+    }
+
+
+def _conversation(n: int):
+    from app.schemas.messaging import ConversationResponse
+
+    a, b = str(uuid4()), str(uuid4())
+    now = datetime.utcnow()
+    messages = [
+        {
+            "message_id": str(uuid4()),
+            "sender_id": a if i % 2 else b,
+            "sender_type": "gym_user",
+            "receiver_id": b if i % 2 else a,
+            "receiver_type": "dietician",
+            "content": "Thanks! I'll follow the meal plan and check in again next week.",
+            "created_at": now - timedelta(minutes=n - i),
+        }
+        for i in range(n)
+    ]
+    return ConversationResponse(messages=messages, total=None, limit=n, offset=0, has_more=True)
+
+
+def _payouts(n: int):
+    from app.schemas.payouts import PayoutOut
+
+    now = datetime.utcnow()
+    return [
+        PayoutOut(
+            payout_id=str(uuid4()),
+            gym_id=str(uuid4()),
+            payment_id=str(uuid4()),
+            amount=Decimal("1250.00"),
+            fee=Decimal("12.50"),
+            net_amount=Decimal("1237.50"),
+            status="completed",
+            initiated_by=str(uuid4()),
+            approved_by=str(uuid4()),
+            approved_at=now,
+            provider="paystack",
+            recipient_code="RCP_1a2b3c4d5e6f",
+            transfer_reference=f"TRF_{uuid4().hex[:16]}",
+            provider_transfer_id=str(10_000_000 + i),
+            processed_date=now,
+            completed_date=now,
+            failure_reason=None,
+            payout_metadata={"bank": "GCB", "channel": "ghipss"},
+            created_at=now,
+            updated_at=now,
+        )
+        for i in range(n)
+    ]
+
+
+BUILDERS = dict(zip(ENDPOINTS, (_gyms, _inbox, _conversation, _payouts)))
+
+
+def _timed(fn, repeat: int) -> float:
+    """Median milliseconds per call"""
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - started) * 1000)
+    return statistics.median(samples)
+
+
+def run_synthetic(items: int, repeat: int) -> list[str]:
+    lines = [
+        f"synthetic payloads, {items} items each, median of {repeat} runs",
+        f"orjson: {'yes' if orjson else 'NOT INSTALLED'}   brotli: {'yes' if brotli else 'NOT INSTALLED'}",
+        "",
+        f"{'endpoint':45} {'json ms':>8} {'orjson ms':>9} {'identity B':>10} {'gzip B':>8} {'br B':>8}",
+    ]
+
+    for endpoint, build in BUILDERS.items():
+        # What FastAPI hands to the response class: JSON-compatible python data
+        content = jsonable_encoder(build(items))
+
+        json_ms = _timed(lambda: JSONResponse(content).body, repeat)
+        orjson_ms = None
+        if orjson is not None:
+            from fastapi.responses import ORJSONResponse
+
+            orjson_ms = _timed(lambda: ORJSONResponse(content).body, repeat)
+
+        body = JSONResponse(content).body
+        gzip_size = len(gzip.compress(body, compresslevel=settings.COMPRESSION_GZIP_LEVEL))
+        br_size = len(brotli.compress(body, quality=settings.COMPRESSION_BROTLI_QUALITY)) if brotli else None
+
+        lines.append(
+            f"{endpoint:45} {json_ms:8.3f} "
+            f"{orjson_ms if orjson_ms is not None else float('nan'):9.3f} "
+            f"{len(body):10d} {gzip_size:8d} {br_size if br_size is not None else '-':>8}"
+        )
+    return lines
+
+
+# -------------------------------------------------
+# LIVE SERVER
+# -------------------------------------------------
+def run_live(base_url: str, token: str, user_id: str, repeat: int) -> list[str]:
+    import httpx
+
+    lines = [
+        f"live server {base_url}, median of {repeat} requests",
+        "",
+        f"{'endpoint':45} {'encoding':9} {'status':>6} {'wire B':>8} {'ms':>8}",
+    ]
+    headers = {"Authorization": f"Bearer {token}"} if token else {}
+
+    with httpx.Client(base_url=base_url, headers=headers, timeout=30) as client:
+        for endpoint in ENDPOINTS:
+            path = endpoint.format(user_id=user_id or uuid4())
+            for encoding in ("identity", "gzip", "br"):
+                wire, samples, status = 0, [], None
+                for _ in range(repeat):
+                    started = time.perf_counter()
+                    # Stream so the raw (still encoded) byte count is visible
+                    with client.stream("GET", path, headers={"Accept-Encoding": encoding}) as response:
+                        wire = sum(len(chunk) for chunk in response.iter_raw())
+                        status = response.status_code
+                    samples.append((time.perf_counter() - started) * 1000)
+                lines.append(f"{path:45} {encoding:9} {status:6d} {wire:8d} {statistics.median(samples):8.2f}")
+    return lines
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--items", type=int, default=50, help="items per synthetic payload")
+    parser.add_argument("--repeat", type=int, default=200)
+    parser.add_argument("--base-url", help="benchmark a running server instead")
+    parser.add_argument("--token", default="", help="access token for --base-url")
+    parser.add_argument("--user-id", default="", help="conversation partner for the messages endpoint")
+    parser.add_argument("--output", help="also write the report to this file")
+    args = parser.parse_args()
+
+    if args.base_url:
+        lines = run_live(args.base_url, args.token, args.user_id, min(args.repeat, 20))
+    else:
+        lines = run_synthetic(args.items, args.repeat)
+
+    report = "\n".join(lines)
+    print(report)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(report + "\n")
+
+
+if __name__ == "__main__":
+    sys.exit(main())